@@ -0,0 +1,104 @@
+"""Compare the generic Variant rules with the caller-specific decoders.
+
+Synthetic Manta and Delly records are decoded with and without the
+decoder of their caller attached, and the time per record is reported
+for END, CIPOS/CIEND and the BEDPE conversion. Run from the repository root:
+
+    python benchmarks/bench_decoders.py --records 100000
+"""
+
+import argparse
+import sys
+import time
+
+from typing import Callable, List, Optional
+
+from svtoolbox.callers import DELLY, MANTA, Decoder
+from svtoolbox.core import Variant
+from svtoolbox.export import to_bedpe
+
+
+def make_variant(chrom: str, pos: int, id: str, alt: str, info: str) -> Variant:
+    return Variant(chrom, str(pos), id, "N", alt, ".", "PASS", info, "GT", {})
+
+
+def make_records(count: int, caller: str) -> List[Variant]:
+    """Return deletions and BND records in roughly equal proportion. Manta
+    BNDs come in pairs linked only through MATEID, so the generic rules
+    fall back to the mate after failing to find CHR2 and POS2. Delly BNDs
+    are single records with the other breakend in CHR2 and POS2."""
+    records: List[Variant] = []
+    for i in range(count // 2):
+        pos = 1000 + i * 10
+        if i % 2:
+            info = f"SVTYPE=DEL;END={pos + 500};CIPOS=-5,5;CIEND=-10,10"
+            records.append(make_variant("chr1", pos, f"DEL{i}", "<DEL>", info))
+            records.append(make_variant("chr1", pos + 5, f"DEL{i}b", "<DEL>", info))
+        elif caller == "manta":
+            first = make_variant(
+                "chr1",
+                pos,
+                f"B{i}:0",
+                f"N[chr2:{pos}[",
+                f"SVTYPE=BND;MATEID=B{i}:1;CIPOS=0,3",
+            )
+            second = make_variant(
+                "chr2",
+                pos,
+                f"B{i}:1",
+                f"]chr1:{pos}]N",
+                f"SVTYPE=BND;MATEID=B{i}:0;CIPOS=0,3",
+            )
+            first.mate, second.mate = second, first
+            records.extend((first, second))
+        else:
+            info = f"SVTYPE=BND;CHR2=chr2;POS2={pos};CIPOS=0,3;CIEND=-3,3"
+            records.append(make_variant("chr1", pos, f"B{i}", f"N[chr2:{pos}[", info))
+            records.append(
+                make_variant("chr1", pos + 5, f"B{i}b", f"N[chr2:{pos}[", info)
+            )
+    return records
+
+
+def time_per_record(
+    records: List[Variant],
+    decoder: Optional[Decoder],
+    work: Callable[[Variant], object],
+    repeat: int = 3,
+) -> float:
+    """Return microseconds per record, the best of repeat passes."""
+    for variant in records:
+        variant.decoder = decoder
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for variant in records:
+            work(variant)
+        best = min(best, (time.perf_counter() - start) * 1e6 / len(records))
+    return best
+
+
+def decode(variant: Variant) -> None:
+    variant.end
+    variant.ci_start
+    variant.ci_end
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    for caller, decoder in (("manta", MANTA), ("delly", DELLY)):
+        records = make_records(args.records, caller)
+        print(f"{caller} records:")
+        for label, work in (("end/ci_start/ci_end", decode), ("to_bedpe", to_bedpe)):
+            print(f"  {label}:")
+            for name, candidate in (("generic", None), (caller, decoder)):
+                us = time_per_record(records, candidate, work)
+                print(f"    {name:8s} {us:6.2f} us/record")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Measure how long it takes before svtoolbox can do any work.
+
+Two numbers are reported: the cumulative import time of svtoolbox.client
+as measured by `python -X importtime`, and the wall-clock time of running
+`svtoolbox --help` in a fresh interpreter. The startup time of a bare
+interpreter is reported as well, and the optional threshold applies to the
+overhead on top of it. The heaviest imports are listed so regressions are
+easy to track down. Run from the repository root:
+
+    python benchmarks/bench_startup.py --runs 20 --threshold-ms 100
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import List, Tuple
+
+BARE_COMMAND = [sys.executable, "-c", "pass"]
+HELP_COMMAND = [
+    sys.executable,
+    "-c",
+    "from svtoolbox.client import run; run()",
+    "--help",
+]
+
+
+def import_times() -> List[Tuple[int, str]]:
+    """Return (cumulative microseconds, module) for every imported module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import svtoolbox.client"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: List[Tuple[int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times.append((int(cumulative), module.strip()))
+    return times
+
+
+def wall_times(command: List[str], runs: int) -> List[float]:
+    """Return wall-clock times in milliseconds of running the command."""
+    timings: List[float] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--threshold-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    times = import_times()
+    total = next(us for us, module in times if module == "svtoolbox.client")
+    print(f"import svtoolbox.client: {total / 1000:.1f} ms (cumulative)")
+    for us, module in sorted(times, reverse=True)[1 : args.top + 1]:
+        print(f"  {us / 1000:8.1f} ms  {module}")
+
+    heavy = [module for _, module in times if module.split(".")[0] == "pysam"]
+    if heavy:
+        print(f"WARNING: pysam is imported at startup ({len(heavy)} modules)")
+
+    bare = statistics.median(wall_times(BARE_COMMAND, args.runs))
+    timings = wall_times(HELP_COMMAND, args.runs)
+    median = statistics.median(timings)
+    print(f"python -c pass: median {bare:.1f} ms over {args.runs} runs")
+    print(
+        f"svtoolbox --help: median {median:.1f} ms, "
+        f"min {min(timings):.1f} ms over {args.runs} runs"
+    )
+    print(f"svtoolbox overhead: {median - bare:.1f} ms")
+
+    if args.threshold_ms is not None and median - bare > args.threshold_ms:
+        print(f"FAILED: overhead exceeds {args.threshold_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
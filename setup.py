@@ -9,6 +9,7 @@ setup(
     entry_points={"console_scripts": ["svtoolbox = svtoolbox.client:run"]},
     python_requires=">=3.10",
     install_requires=["click", "pysam", "setuptools"],
+    extras_require={"arrow": ["pyarrow"], "numpy": ["numpy"]},
     author="Michael Knudsen",
     author_email="micknudsen@gmail.com",
 )
@@ -0,0 +1,131 @@
+import asyncio
+import gzip
+import io
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import AsyncIterator, List, Optional, TextIO, Union
+
+from svtoolbox.core import Variant
+from svtoolbox.parser import MateResolver, VcfReader
+
+# Number of variants in each batch handed to the event loop
+DEFAULT_BATCH_SIZE = 10000
+
+# Number of batches read ahead of the consumer
+DEFAULT_QUEUE_SIZE = 4
+
+# Size of the blocks read from the compressed file
+READ_BUFFER_SIZE = 1 << 20
+
+
+def _open_vcf(path: str) -> TextIO:
+    raw = io.BufferedReader(gzip.GzipFile(path), buffer_size=READ_BUFFER_SIZE)
+    return io.TextIOWrapper(raw)
+
+
+async def aiter_vcf(
+    path: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    samples: Optional[List[str]] = None,
+) -> AsyncIterator[List[Variant]]:
+    """Read a gzipped VCF file without blocking the event loop, and yield
+    batches of variants. Reading and parsing happen in a thread of their
+    own, which stays at most queue_size batches ahead of the consumer.
+    BND mates are not linked; use MateResolver for that.
+
+    Cancelling the consumer, or closing the generator early, stops the
+    reader once the batch it is working on is done."""
+    loop = asyncio.get_running_loop()
+    # A single thread keeps reads and the final close in order
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="aiter_vcf")
+    queue: asyncio.Queue[Union[List[Variant], BaseException, None]] = asyncio.Queue(
+        maxsize=queue_size
+    )
+
+    stream = await loop.run_in_executor(executor, _open_vcf, path)
+
+    async def produce() -> None:
+        try:
+            reader = await loop.run_in_executor(executor, VcfReader, stream, samples)
+            iterator = iter(reader)
+            while True:
+                batch = await loop.run_in_executor(
+                    executor, lambda: list(islice(iterator, batch_size))
+                )
+                if not batch:
+                    break
+                await queue.put(batch)
+            await queue.put(None)
+        except asyncio.CancelledError:
+            raise
+        except BaseException as error:
+            await queue.put(error)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+        await loop.run_in_executor(executor, stream.close)
+        executor.shutdown(wait=False)
+
+
+def _write_batch(
+    out: TextIO, variants: List[Variant], include_fields: Optional[List[str]]
+) -> int:
+    for variant in variants:
+        out.write(f"{variant.to_bedpe(include_fields=include_fields)}\n")
+    return len(variants)
+
+
+async def write_bedpe(
+    vcf: str,
+    output: str,
+    include_fields: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> int:
+    """Convert a gzipped VCF file to BEDPE without blocking the event loop,
+    and return the number of lines written. Formatting and writing happen
+    in a separate thread. BND variants are written once their mate has
+    been read, so the order of lines can differ from create-bedpe. If the
+    conversion fails or is cancelled, the output file is removed."""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="write_bedpe")
+    resolver = MateResolver()
+    lines = 0
+
+    out = await loop.run_in_executor(executor, open, output, "w")
+    try:
+        async for batch in aiter_vcf(
+            vcf, batch_size=batch_size, queue_size=queue_size, samples=[]
+        ):
+            ready = [linked for variant in batch for linked in resolver.add(variant)]
+            lines += await loop.run_in_executor(
+                executor, _write_batch, out, ready, include_fields
+            )
+        lines += await loop.run_in_executor(
+            executor, _write_batch, out, resolver.finish(), include_fields
+        )
+    except BaseException:
+        await loop.run_in_executor(executor, out.close)
+        await loop.run_in_executor(executor, os.remove, output)
+        raise
+    else:
+        await loop.run_in_executor(executor, out.close)
+    finally:
+        executor.shutdown(wait=False)
+    return lines
@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+from typing import IO, Dict, Iterable, List, Union
+
+from svtoolbox.bed import BedIndex
+from svtoolbox.bgzf import BgzfWriter
+from svtoolbox.contigs import header_id
+from svtoolbox.core import Interval, Variant
+from svtoolbox.exceptions import InfoFieldNotFound, MissingMate
+from svtoolbox.parser import VcfReader
+
+InfoValue = Union[str, bool]
+
+
+class Annotator(ABC):
+    """Base class for annotators. An annotator computes new INFO fields for
+    one variant at a time, and declares the header lines describing them."""
+
+    header_lines: List[str] = []
+
+    @abstractmethod
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        """Return the INFO fields to add to the variant."""
+
+
+class SvLenAnnotator(Annotator):
+    """Add SVLEN to variants with an END position. Deletions get negative
+    lengths. Variants which already have SVLEN are left alone."""
+
+    header_lines = [
+        '##INFO=<ID=SVLEN,Number=.,Type=Integer,Description="Difference in length between REF and ALT alleles">'
+    ]
+
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        if "SVLEN" in variant.info_dict:
+            return {}
+        svtype = variant.info_dict.get("SVTYPE")
+        if svtype in ("BND", "INS") or "END" not in variant.info_dict:
+            return {}
+        length = variant.end.pos - variant.start.pos
+        return {"SVLEN": str(-length if svtype == "DEL" else length)}
+
+
+class ConfidenceIntervalAnnotator(Annotator):
+    """Add the confidence intervals of both breakpoints in BEDPE coordinates
+    (0-based and half-open). For BND variants whose mate is not known, only
+    the first breakpoint is annotated."""
+
+    header_lines = [
+        '##INFO=<ID=BEDPE_CI1,Number=2,Type=Integer,Description="Confidence interval around POS in BEDPE coordinates">',
+        '##INFO=<ID=BEDPE_CI2,Number=2,Type=Integer,Description="Confidence interval around END in BEDPE coordinates">',
+    ]
+
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        ci_start = variant.ci_start
+        annotations: Dict[str, InfoValue] = {
+            "BEDPE_CI1": f"{ci_start.left - 1},{ci_start.right}"
+        }
+        try:
+            ci_end = variant.ci_end
+        except (InfoFieldNotFound, MissingMate):
+            return annotations
+        annotations["BEDPE_CI2"] = f"{ci_end.left - 1},{ci_end.right}"
+        return annotations
+
+
+class MateEndAnnotator(Annotator):
+    """Add the mate position of BND variants as CHR2 and POS2, taken from
+    the breakend ALT allele. This is the style used by Delly, so the end
+    position of annotated variants can be found without the mate record."""
+
+    header_lines = [
+        '##INFO=<ID=CHR2,Number=1,Type=String,Description="Chromosome of the mate breakend">',
+        '##INFO=<ID=POS2,Number=1,Type=Integer,Description="Position of the mate breakend">',
+    ]
+
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        if variant.info_dict.get("SVTYPE") != "BND" or "CHR2" in variant.info_dict:
+            return {}
+        mate = variant.alt_mate
+        if mate is None:
+            return {}
+        return {"CHR2": mate.chrom, "POS2": str(mate.pos)}
+
+
+class BedOverlapAnnotator(Annotator):
+    """List the BED regions overlapping the confidence interval of either
+    breakpoint. Regions are given by name, or by location if unnamed."""
+
+    def __init__(self, index: BedIndex, key: str = "BED_OVERLAP") -> None:
+        self.index = index
+        self.key = key
+        self.header_lines = [
+            f'##INFO=<ID={key},Number=.,Type=String,Description="Overlapping BED regions">'
+        ]
+
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        intervals: List[Interval] = [variant.ci_start]
+        try:
+            intervals.append(variant.ci_end)
+        except (InfoFieldNotFound, MissingMate):
+            pass
+        names: Dict[str, None] = {}
+        for interval in intervals:
+            for region in self.index.hits(interval):
+                names[str(region)] = None
+        return {self.key: ",".join(names)} if names else {}
+
+
+class ComponentAnnotator(Annotator):
+    """Add the rearrangement component of each variant, as found by
+    rearrangement_components in a previous pass over the file."""
+
+    header_lines = [
+        '##INFO=<ID=COMPONENT,Number=1,Type=Integer,Description="Connected component in the breakpoint graph">'
+    ]
+
+    def __init__(self, components: Dict[str, int]) -> None:
+        self.components = components
+
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        component = self.components.get(variant.id)
+        return {"COMPONENT": str(component)} if component is not None else {}
+
+
+def annotated_header(header: List[str], annotators: List[Annotator]) -> List[str]:
+    """Insert the INFO header lines of the annotators just before the
+    #CHROM line. Fields which are already described are not added again."""
+    existing = {header_id(line) for line in header}
+    lines = [
+        line
+        for annotator in annotators
+        for line in annotator.header_lines
+        if header_id(line) not in existing
+    ]
+    if header and header[-1].startswith("#CHROM"):
+        return header[:-1] + lines + header[-1:]
+    return header + lines
+
+
+def annotate_record(line: str, variant: Variant, annotators: List[Annotator]) -> str:
+    """Return the annotated line. The annotators are applied in order, and
+    each one sees the fields added by the previous ones. Unmodified records
+    are passed through as is. New INFO fields are appended to the original
+    INFO column, which is only rebuilt from the INFO dictionary if an
+    existing field is changed. All other columns are left untouched."""
+    annotations: Dict[str, InfoValue] = {}
+    rebuild = False
+    for annotator in annotators:
+        # Fields are set right away, so later annotators can use them
+        for key, value in annotator.annotate(variant).items():
+            rebuild = rebuild or (key in variant.info_dict and key not in annotations)
+            variant.set_info(key, value)
+            annotations[key] = value
+    if not annotations:
+        return line if line.endswith("\n") else f"{line}\n"
+
+    columns = line.rstrip("\n").split("\t", 8)
+    if rebuild:
+        columns[7] = variant.format_info()
+    else:
+        entries = ";".join(
+            f"{key}={value}" if isinstance(value, str) else key
+            for key, value in annotations.items()
+        )
+        columns[7] = entries if columns[7] in ("", ".") else f"{columns[7]};{entries}"
+    return "\t".join(columns) + "\n"
+
+
+def annotate_vcf(
+    stream: Iterable[str],
+    out: Union[IO, BgzfWriter],
+    annotators: List[Annotator],
+) -> int:
+    """Stream a VCF file through the annotators and return the number of
+    records written. Genotype columns are passed through without being
+    parsed."""
+    reader = VcfReader(stream, samples=[])
+    for line in annotated_header(reader.header, annotators):
+        out.write(f"{line}\n")
+    records = 0
+    for line, variant in reader.records():
+        out.write(annotate_record(line, variant, annotators))
+        records += 1
+    return records
@@ -0,0 +1,243 @@
+import re
+
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from svtoolbox.contigs import header_id
+from svtoolbox.core import Variant
+from svtoolbox.dependencies import import_pyarrow
+
+# Number of variants gathered in each record batch before it is handed
+# on to the writer. This is what keeps memory bounded for large files.
+DEFAULT_BATCH_SIZE = 65536
+
+INFO_NUMBER = re.compile(r"[<,]Number=([^,>]+)")
+INFO_TYPE = re.compile(r"[<,]Type=([^,>]+)")
+
+InfoColumnValue = Union[str, int, float, bool, None]
+
+
+def info_types(header: Iterable[str]) -> Dict[str, str]:
+    """Return the column type of each INFO field declared in the header,
+    such as ##INFO=<ID=END,Number=1,Type=Integer,...>. Single Integer and
+    Float values become int64 and float64, flags become bool, and anything
+    else, including lists of numbers, stays a string."""
+    types: Dict[str, str] = {}
+    for line in header:
+        key = header_id(line)
+        if key is None:
+            continue
+        number = INFO_NUMBER.search(line)
+        value_type = INFO_TYPE.search(line)
+        match (
+            value_type.group(1) if value_type else None,
+            number.group(1) if number else None,
+        ):
+            case ("Flag", _):
+                types[key] = "bool"
+            case ("Integer", "1"):
+                types[key] = "int64"
+            case ("Float", "1"):
+                types[key] = "float64"
+            case _:
+                types[key] = "string"
+    return types
+
+
+def bedpe_schema(
+    info_keys: Optional[List[str]] = None,
+    format_keys: Optional[List[str]] = None,
+    samples: Optional[List[str]] = None,
+    types: Optional[Dict[str, str]] = None,
+) -> Any:
+    """Return the Arrow schema used for exporting variants. INFO values
+    are stored in columns named INFO_<KEY> and FORMAT values are stored in
+    columns named <SAMPLE>_<KEY>. The remaining columns mirror BEDPE. INFO
+    columns get the types found by info_types, and are strings if no type
+    is known."""
+    pa = import_pyarrow()
+    arrow_types = {
+        "string": pa.string(),
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+    }
+    fields = [
+        pa.field("chrom_1", pa.string(), nullable=False),
+        pa.field("start_1", pa.int64(), nullable=False),
+        pa.field("end_1", pa.int64(), nullable=False),
+        pa.field("chrom_2", pa.string(), nullable=False),
+        pa.field("start_2", pa.int64(), nullable=False),
+        pa.field("end_2", pa.int64(), nullable=False),
+        pa.field("name", pa.string(), nullable=False),
+        pa.field("qual", pa.float64()),
+        pa.field("filter", pa.string()),
+        pa.field("svtype", pa.string()),
+    ]
+    for key in info_keys or []:
+        column_type = (types or {}).get(key, "string")
+        fields.append(pa.field(f"INFO_{key}", arrow_types[column_type]))
+    for sample in samples or []:
+        for key in format_keys or []:
+            fields.append(pa.field(f"{sample}_{key}", pa.string()))
+    return pa.schema(fields)
+
+
+def _info_value(
+    variant: Variant, key: str, column_type: str = "string"
+) -> InfoColumnValue:
+    """Convert an INFO value to the column type. In string columns, flags
+    are stored as "true". Missing keys and values that do not parse become
+    null, except in flag columns, where a missing flag is false."""
+    value = variant.info_dict.get(key)
+    if column_type == "bool":
+        return value is not None
+    if value is None:
+        return None
+    if value is True:
+        return "true" if column_type == "string" else None
+    try:
+        match column_type:
+            case "int64":
+                return int(value)
+            case "float64":
+                return float(value)
+    except ValueError:
+        return None
+    return value
+
+
+def iter_record_batches(
+    variants: Iterable[Variant],
+    info_keys: Optional[List[str]] = None,
+    format_keys: Optional[List[str]] = None,
+    samples: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    types: Optional[Dict[str, str]] = None,
+) -> Iterator[Any]:
+    """Convert variants to Arrow record batches with at most batch_size
+    rows each. If FORMAT keys are requested but no samples are given, the
+    samples of the first variant are used. INFO columns are typed from
+    types, as returned by info_types."""
+    pa = import_pyarrow()
+
+    iterator = iter(variants)
+    if format_keys and samples is None:
+        try:
+            first = next(iterator)
+        except StopIteration:
+            return
+        samples = list(first.genotypes)
+        iterator = chain([first], iterator)
+
+    types = types or {}
+    schema = bedpe_schema(info_keys, format_keys, samples, types)
+    columns: Dict[str, List[Any]] = {name: [] for name in schema.names}
+
+    def flush() -> Any:
+        batch = pa.RecordBatch.from_pydict(columns, schema=schema)
+        for values in columns.values():
+            values.clear()
+        return batch
+
+    for variant in iterator:
+        bedpe = variant.to_bedpe()
+        columns["chrom_1"].append(bedpe.chrom_1)
+        columns["start_1"].append(bedpe.start_1)
+        columns["end_1"].append(bedpe.end_1)
+        columns["chrom_2"].append(bedpe.chrom_2)
+        columns["start_2"].append(bedpe.start_2)
+        columns["end_2"].append(bedpe.end_2)
+        columns["name"].append(bedpe.name)
+        columns["qual"].append(None if variant.qual == "." else float(variant.qual))
+        columns["filter"].append(None if variant.filter == "." else variant.filter)
+        columns["svtype"].append(_info_value(variant, "SVTYPE"))
+        for key in info_keys or []:
+            columns[f"INFO_{key}"].append(
+                _info_value(variant, key, types.get(key, "string"))
+            )
+        for sample in samples or []:
+            format_dict = variant.format_dicts.get(sample, {})
+            for key in format_keys or []:
+                columns[f"{sample}_{key}"].append(format_dict.get(key))
+        if len(columns["name"]) >= batch_size:
+            yield flush()
+
+    if columns["name"]:
+        yield flush()
+
+
+def to_arrow_table(
+    variants: Iterable[Variant],
+    info_keys: Optional[List[str]] = None,
+    format_keys: Optional[List[str]] = None,
+    samples: Optional[List[str]] = None,
+    types: Optional[Dict[str, str]] = None,
+) -> Any:
+    """Convert variants to an Arrow table."""
+    pa = import_pyarrow()
+    batches = list(
+        iter_record_batches(
+            variants,
+            info_keys=info_keys,
+            format_keys=format_keys,
+            samples=samples,
+            types=types,
+        )
+    )
+    if not batches:
+        return bedpe_schema(info_keys, format_keys, samples, types).empty_table()
+    return pa.Table.from_batches(batches)
+
+
+def write_arrow(
+    variants: Iterable[Variant],
+    path: str,
+    file_format: str = "parquet",
+    info_keys: Optional[List[str]] = None,
+    format_keys: Optional[List[str]] = None,
+    samples: Optional[List[str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    types: Optional[Dict[str, str]] = None,
+) -> int:
+    """Write variants to a Parquet file or an Arrow IPC file and return the
+    number of rows written. Batches are written as soon as they are full,
+    so only one batch is kept in memory."""
+    import_pyarrow()
+
+    rows = 0
+    writer = None
+    for batch in iter_record_batches(
+        variants,
+        info_keys=info_keys,
+        format_keys=format_keys,
+        samples=samples,
+        batch_size=batch_size,
+        types=types,
+    ):
+        if writer is None:
+            writer = _open_writer(path, file_format, batch.schema)
+        writer.write_batch(batch)
+        rows += batch.num_rows
+
+    if writer is None:
+        # Make sure an empty file with the right schema is written
+        # when there are no variants at all.
+        schema = bedpe_schema(info_keys, format_keys, samples or [], types)
+        writer = _open_writer(path, file_format, schema)
+    writer.close()
+
+    return rows
+
+
+def _open_writer(path: str, file_format: str, schema: Any) -> Any:
+    pa = import_pyarrow()
+    match file_format:
+        case "parquet":
+            import pyarrow.parquet  # type: ignore
+
+            return pyarrow.parquet.ParquetWriter(path, schema)
+        case "arrow":
+            return pa.ipc.new_file(path, schema)
+        case _:
+            raise ValueError(f"Unknown file format: {file_format}")
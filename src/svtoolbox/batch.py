@@ -0,0 +1,151 @@
+import os
+import time
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# File name extensions used for the {ext} placeholder in output templates
+EXTENSIONS = {"bedpe": "bedpe", "parquet": "parquet", "arrow": "arrow"}
+
+DEFAULT_TEMPLATE = "{dir}/{stem}.{ext}"
+
+
+@dataclass
+class BatchResult:
+    vcf: str
+    output: str
+    variants: int
+    seconds: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def vcf_stem(path: str) -> str:
+    """Return the file name without directory and .vcf/.vcf.gz extension."""
+    name = os.path.basename(path)
+    for extension in (".vcf.gz", ".vcf.bgz", ".vcf"):
+        if name.endswith(extension):
+            return name[: -len(extension)]
+    return name
+
+
+def output_path(vcf: str, template: str, output_format: str = "bedpe") -> str:
+    """Fill in the output template for a VCF file. The placeholders {dir},
+    {name}, {stem} and {ext} are replaced by the directory and file name
+    of the VCF file, the file name without extension, and the extension
+    matching the output format."""
+    return template.format(
+        dir=os.path.dirname(vcf) or ".",
+        name=os.path.basename(vcf),
+        stem=vcf_stem(vcf),
+        ext=EXTENSIONS[output_format],
+    )
+
+
+def expand_inputs(paths: Iterable[str]) -> List[str]:
+    """Replace directories by the gzipped VCF files they contain."""
+    vcfs: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            vcfs.extend(
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.endswith((".vcf.gz", ".vcf.bgz"))
+            )
+        else:
+            vcfs.append(path)
+    return vcfs
+
+
+def process_vcf(
+    vcf: str,
+    output: str,
+    output_format: str = "bedpe",
+    include_fields: Optional[List[str]] = None,
+) -> BatchResult:
+    """Convert a single VCF file. Errors are caught and reported in the
+    result, so that one broken file does not stop the whole batch."""
+    from svtoolbox.export import convert_vcf
+
+    start = time.perf_counter()
+    try:
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        variants = convert_vcf(
+            vcf,
+            output=output,
+            output_format=output_format,
+            include_fields=include_fields,
+        )
+    except Exception as error:
+        # Do not leave a truncated output file behind
+        if os.path.exists(output):
+            os.remove(output)
+        return BatchResult(
+            vcf=vcf,
+            output=output,
+            variants=0,
+            seconds=time.perf_counter() - start,
+            error=f"{type(error).__name__}: {error}",
+        )
+    return BatchResult(
+        vcf=vcf,
+        output=output,
+        variants=variants,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def run_batch(
+    vcfs: List[str],
+    template: str = DEFAULT_TEMPLATE,
+    output_format: str = "bedpe",
+    include_fields: Optional[List[str]] = None,
+    jobs: int = 1,
+) -> Iterator[BatchResult]:
+    """Convert many VCF files and yield results as the files finish. With
+    more than one job, the files are spread over a shared process pool."""
+    if jobs == 1:
+        for vcf in vcfs:
+            yield process_vcf(
+                vcf,
+                output_path(vcf, template, output_format),
+                output_format,
+                include_fields,
+            )
+        return
+
+    # The process pool is slow to import, and only needed with several jobs
+    from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures: Dict[Future, Tuple[str, str]] = {}
+        for vcf in vcfs:
+            output = output_path(vcf, template, output_format)
+            future = executor.submit(
+                process_vcf, vcf, output, output_format, include_fields
+            )
+            futures[future] = (vcf, output)
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                # Errors in a file are reported by process_vcf, so this is a
+                # worker that died, for example killed for running out of
+                # memory. That breaks the pool, and every file not finished
+                # yet is reported as failed instead of aborting the batch.
+                vcf, output = futures[future]
+                if os.path.exists(output):
+                    os.remove(output)
+                result = BatchResult(
+                    vcf=vcf,
+                    output=output,
+                    variants=0,
+                    seconds=0.0,
+                    error=f"{type(error).__name__}: {error}",
+                )
+            yield result
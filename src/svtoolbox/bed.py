@@ -0,0 +1,147 @@
+import gzip
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from svtoolbox.core import Interval, Variant
+from svtoolbox.exceptions import InfoFieldNotFound, MissingMate
+
+
+@dataclass
+class BedRegion:
+    """A BED region. Coordinates are 0-based and half-open."""
+
+    chrom: str
+    start: int
+    end: int
+    name: Optional[str] = None
+
+    def __str__(self) -> str:
+        return (
+            self.name
+            if self.name is not None
+            else f"{self.chrom}:{self.start + 1}-{self.end}"
+        )
+
+
+def parse_bed(stream: Iterable[str]) -> List[BedRegion]:
+    """Read BED regions. Header, track and comment lines are skipped."""
+    regions: List[BedRegion] = []
+    for line in stream:
+        if not line.strip() or line.startswith(("#", "track", "browser")):
+            continue
+        columns = line.rstrip("\n").split("\t")
+        regions.append(
+            BedRegion(
+                chrom=columns[0],
+                start=int(columns[1]),
+                end=int(columns[2]),
+                name=columns[3] if len(columns) > 3 else None,
+            )
+        )
+    return regions
+
+
+class BedIndex:
+    """Sorted per-chromosome arrays of BED regions, queried with binary
+    search. Overlapping regions are merged for plain overlap tests, which
+    then cost O(log R) for R regions. The unmerged regions are kept for
+    looking up which regions are hit."""
+
+    def __init__(self, regions: Iterable[BedRegion]) -> None:
+        by_chrom: Dict[str, List[BedRegion]] = {}
+        for region in regions:
+            by_chrom.setdefault(region.chrom, []).append(region)
+
+        self._regions: Dict[str, List[BedRegion]] = {}
+        self._starts: Dict[str, List[int]] = {}
+        self._longest: Dict[str, int] = {}
+        self._merged_starts: Dict[str, List[int]] = {}
+        self._merged_ends: Dict[str, List[int]] = {}
+
+        for chrom, chrom_regions in by_chrom.items():
+            chrom_regions.sort(key=lambda region: (region.start, region.end))
+            self._regions[chrom] = chrom_regions
+            self._starts[chrom] = [region.start for region in chrom_regions]
+            self._longest[chrom] = max(
+                region.end - region.start for region in chrom_regions
+            )
+
+            merged_starts: List[int] = []
+            merged_ends: List[int] = []
+            for region in chrom_regions:
+                if merged_ends and region.start <= merged_ends[-1]:
+                    merged_ends[-1] = max(merged_ends[-1], region.end)
+                else:
+                    merged_starts.append(region.start)
+                    merged_ends.append(region.end)
+            self._merged_starts[chrom] = merged_starts
+            self._merged_ends[chrom] = merged_ends
+
+    @classmethod
+    def from_file(cls, path: str) -> "BedIndex":
+        """Load a BED file, which may be gzipped."""
+        stream: TextIO
+        with gzip.open(path, "rt") if path.endswith(".gz") else open(path) as stream:
+            return cls(parse_bed(stream))
+
+    def overlaps(self, interval: Interval) -> bool:
+        """Check whether the 1-based closed interval overlaps any region."""
+        starts = self._merged_starts.get(interval.chrom)
+        if starts is None:
+            return False
+        # The last merged region starting at or before the right end of
+        # the interval is the only one that can overlap it.
+        index = bisect_left(starts, interval.right) - 1
+        return index >= 0 and self._merged_ends[interval.chrom][index] >= interval.left
+
+    def hits(self, interval: Interval) -> List[BedRegion]:
+        """Return all regions overlapping the 1-based closed interval."""
+        starts = self._starts.get(interval.chrom)
+        if starts is None:
+            return []
+        regions = self._regions[interval.chrom]
+        first = bisect_left(starts, interval.left - self._longest[interval.chrom])
+        last = bisect_left(starts, interval.right)
+        return [region for region in regions[first:last] if region.end >= interval.left]
+
+
+def breakpoint_intervals(variant: Variant) -> List[Interval]:
+    """Return the confidence intervals of the breakpoints that are known.
+    A BND whose mate record is missing falls back on the position in its
+    ALT allele, and a variant without an end only has its start."""
+    try:
+        return [variant.ci_start, variant.ci_end]
+    except (InfoFieldNotFound, MissingMate):
+        pass
+    mate = variant.alt_mate
+    if mate is None:
+        return [variant.ci_start]
+    return [
+        variant.ci_start,
+        Interval(chrom=mate.chrom, left=mate.pos, right=mate.pos),
+    ]
+
+
+def filter_variants(
+    variants: Iterable[Variant],
+    include: Optional[BedIndex] = None,
+    exclude: Optional[BedIndex] = None,
+) -> Iterator[Variant]:
+    """Filter variants on the confidence intervals of their breakpoints.
+    Variants where either breakpoint overlaps an excluded region are
+    dropped. If include regions are given, both breakpoints must overlap
+    them. Only the breakpoints that are known are tested. Each test is a
+    binary search, so the cost per variant is O(log R) for R regions."""
+    for variant in variants:
+        breakpoints = breakpoint_intervals(variant)
+        if exclude is not None and any(
+            exclude.overlaps(interval) for interval in breakpoints
+        ):
+            continue
+        if include is not None and not all(
+            include.overlaps(interval) for interval in breakpoints
+        ):
+            continue
+        yield variant
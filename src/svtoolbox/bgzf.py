@@ -0,0 +1,73 @@
+import struct
+import zlib
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Optional
+
+# Uncompressed bytes per block. This is the block size used by htslib,
+# and it guarantees that a compressed block fits within 64 KiB.
+BLOCK_SIZE = 0xFF00
+
+# The empty block marking the end of a BGZF file
+EOF_BLOCK = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """Compress data into a single BGZF block, which is a gzip member with
+    the total block size stored in an extra field."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    payload = compressor.compress(data) + compressor.flush()
+    header = struct.pack(
+        "<BBBBIBBHBBHH", 31, 139, 8, 4, 0, 0, 255, 6, 66, 67, 2, len(payload) + 25
+    )
+    footer = struct.pack("<II", zlib.crc32(data), len(data))
+    return header + payload + footer
+
+
+class BgzfWriter:
+    """Write a BGZF compressed file, which can be indexed with tabix.
+    Blocks are compressed in a pool of threads (zlib releases the GIL) and
+    written in order. At most a few blocks per thread are in flight at any
+    time, so memory use stays bounded."""
+
+    def __init__(self, path: str, threads: int = 1, level: int = 6) -> None:
+        self._stream = open(path, "wb")
+        self._level = level
+        self._buffer = bytearray()
+        self._pending: Deque[Future] = deque()
+        self._max_pending = 4 * threads
+        self._executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        )
+
+    def write(self, text: str) -> None:
+        self._buffer += text.encode()
+        while len(self._buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self._buffer[:BLOCK_SIZE]))
+            del self._buffer[:BLOCK_SIZE]
+
+    def _submit(self, data: bytes) -> None:
+        if self._executor is None:
+            self._stream.write(compress_block(data, self._level))
+            return
+        self._pending.append(self._executor.submit(compress_block, data, self._level))
+        while len(self._pending) > self._max_pending:
+            self._stream.write(self._pending.popleft().result())
+
+    def close(self) -> None:
+        if self._buffer:
+            self._submit(bytes(self._buffer))
+            self._buffer.clear()
+        while self._pending:
+            self._stream.write(self._pending.popleft().result())
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._stream.write(EOF_BLOCK)
+        self._stream.close()
+
+    def __enter__(self) -> "BgzfWriter":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -0,0 +1,109 @@
+from typing import Iterable, Optional, Tuple
+
+from svtoolbox.contigs import header_id
+from svtoolbox.core import Interval, Position, Variant
+from svtoolbox.exceptions import InfoFieldNotFound, MissingMate
+
+
+def _offsets(value: object) -> Tuple[int, int]:
+    left, right = str(value).split(",")
+    return int(left), int(right)
+
+
+class Decoder:
+    """Caller-specific rules for END, mates and confidence intervals. The
+    rules are resolved with dictionary lookups instead of by catching
+    exceptions, which the generic code in Variant relies on.
+
+    Values are resolved on each access rather than kept on the record.
+    Conversions read each value once per record, and keeping them adds
+    objects to every record held in memory while mates are linked, which
+    costs more in garbage collection than the lookups it saves."""
+
+    name = "default"
+
+    def end(self, variant: Variant) -> Position:
+        info = variant.info_dict
+        if "END" not in info:
+            raise InfoFieldNotFound("END")
+        return Position(variant.chrom, int(str(info["END"])))
+
+    def ci_start(self, variant: Variant) -> Interval:
+        pos = int(variant.pos)
+        cipos = variant.info_dict.get("CIPOS")
+        if cipos is None:
+            return Interval(chrom=variant.chrom, left=pos, right=pos)
+        left, right = _offsets(cipos)
+        return Interval(chrom=variant.chrom, left=pos + left, right=pos + right)
+
+    def ci_end(self, variant: Variant) -> Interval:
+        end = self.end(variant)
+        ciend = variant.info_dict.get("CIEND")
+        if ciend is None:
+            return Interval(chrom=end.chrom, left=end.pos, right=end.pos)
+        left, right = _offsets(ciend)
+        return Interval(chrom=end.chrom, left=end.pos + left, right=end.pos + right)
+
+
+class MantaDecoder(Decoder):
+    """Manta reports each breakend of a translocation as a BND record of its
+    own, linked to the other one through MATEID. The end of a BND is the
+    start of its mate, and so is the confidence interval of the end."""
+
+    name = "manta"
+
+    def end(self, variant: Variant) -> Position:
+        info = variant.info_dict
+        if info.get("SVTYPE") != "BND":
+            return super().end(variant)
+        if variant.mate is not None:
+            return Position(variant.mate.chrom, int(variant.mate.pos))
+        # Records annotated with CHR2 and POS2 do not need their mate
+        if "CHR2" in info and "POS2" in info:
+            return Position(str(info["CHR2"]), int(str(info["POS2"])))
+        raise MissingMate(variant.id)
+
+    def ci_end(self, variant: Variant) -> Interval:
+        if variant.mate is not None and variant.info_dict.get("SVTYPE") == "BND":
+            return self.ci_start(variant.mate)
+        return super().ci_end(variant)
+
+
+class DellyDecoder(Decoder):
+    """Delly reports a translocation as a single BND record, with the other
+    breakend in the CHR2 and POS2 INFO fields."""
+
+    name = "delly"
+
+    def end(self, variant: Variant) -> Position:
+        info = variant.info_dict
+        if info.get("SVTYPE") == "BND" and "CHR2" in info and "POS2" in info:
+            return Position(str(info["CHR2"]), int(str(info["POS2"])))
+        return super().end(variant)
+
+
+MANTA = MantaDecoder()
+DELLY = DellyDecoder()
+
+
+def detect_caller(header: Iterable[str]) -> Optional[Decoder]:
+    """Pick a decoder from the ##source line, or from the INFO fields that
+    are defined if there is no recognizable ##source line. Return None if
+    the caller cannot be determined."""
+    info_ids = set()
+    for line in header:
+        if line.startswith("##source="):
+            source = line.lower()
+            if "manta" in source or "generatesvcandidates" in source:
+                return MANTA
+            if "delly" in source:
+                return DELLY
+        else:
+            info_id = header_id(line)
+            if info_id is not None:
+                info_ids.add(info_id)
+    if {"CHR2", "POS2"} <= info_ids and "MATEID" not in info_ids:
+        return DELLY
+    if "MATEID" in info_ids and not {"CHR2", "POS2"} & info_ids:
+        return MANTA
+    return None
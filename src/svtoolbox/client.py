@@ -1,39 +1,216 @@
 import gzip
+import time
 
 import click
 
-from collections import defaultdict
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, TextIO, Tuple
 
-from pysam import AlignedSegment, AlignmentFile
+from svtoolbox.core import Variant
+from svtoolbox.exceptions import InfoFieldNotFound
+from svtoolbox.memory import MemoryBudget, format_size, peak_rss
+from svtoolbox.parser import VcfReader, parse_vcf, resolve_mates
 
-from svtoolbox.exceptions import InfoFieldNotFound, SVToolBoxException
-from svtoolbox.parser import parse_vcf
+if TYPE_CHECKING:
+    from svtoolbox.batch import BatchResult
+    from svtoolbox.bed import BedIndex
+
+# Modules needed by a single command are imported inside that command, so
+# starting the CLI stays fast. Option defaults are repeated here for the
+# same reason, and tests/test_client.py checks that they stay in sync.
+DEFAULT_BUFFER_SIZE = 256 * 1024 * 1024
+DEFAULT_TEMPLATE = "{dir}/{stem}.{ext}"
+DEFAULT_BIN_SIZE = 100_000
+DEFAULT_FLANK = 500
+
+
+class ByteSize(click.ParamType):
+    """A number of bytes with an optional K, M, G or T suffix."""
+
+    name = "size"
+    units = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+    def convert(self, value, param, ctx) -> int:
+        if isinstance(value, int):
+            return value
+        text = str(value).strip().upper().removesuffix("B")
+        unit = text[-1:] if text[-1:] in self.units else ""
+        try:
+            return int(float(text[: len(text) - len(unit)]) * self.units[unit])
+        except ValueError:
+            self.fail(f"{value!r} is not a valid size", param, ctx)
+
+
+def load_regions(path: Optional[str]) -> Optional["BedIndex"]:
+    from svtoolbox.bed import BedIndex
+
+    return BedIndex.from_file(path) if path is not None else None
+
+
+region_options = [
+    click.option(
+        "--include_bed",
+        type=click.Path(exists=True),
+        required=False,
+        help="Keep variants with both breakpoints in these regions.",
+    ),
+    click.option(
+        "--exclude_bed",
+        type=click.Path(exists=True),
+        required=False,
+        help="Drop variants with a breakpoint in these regions.",
+    ),
+]
+
+
+def add_region_options(command):
+    for option in reversed(region_options):
+        command = option(command)
+    return command
+
+
+def memory_budget(ctx: click.Context) -> MemoryBudget:
+    return ctx.obj if isinstance(ctx.obj, MemoryBudget) else MemoryBudget()
 
 
 @click.group()
-def client():
-    pass
+@click.option(
+    "--max_memory",
+    "--max-memory",
+    type=ByteSize(),
+    required=False,
+    help="Bound sort buffers, pending BND mates and output batches by this size.",
+)
+@click.pass_context
+def client(ctx: click.Context, max_memory: Optional[int] = None) -> None:
+    ctx.obj = MemoryBudget(total=max_memory)
+
+
+@client.result_callback()
+def report_memory(result: object, max_memory: Optional[int] = None) -> None:
+    """Report the peak memory of the run when a limit was given."""
+    if max_memory is None:
+        return
+    peak = peak_rss()
+    click.echo(
+        f"Peak memory: {format_size(peak)} (limit {format_size(max_memory)})",
+        err=True,
+    )
 
 
 @client.command()
 @click.option("--vcf", type=click.Path(exists=True), required=True)
 @click.option("--include_fields", type=str, required=False)
-def create_bedpe(vcf: str, include_fields: Optional[str] = None) -> None:
-    with gzip.open(vcf, "rt") as stream:
-        for variant in parse_vcf(stream).values():
-            print(
-                variant.to_bedpe(
-                    include_fields=include_fields.split(",") if include_fields else None
-                )
-            )
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["bedpe", "parquet", "arrow"]),
+    default="bedpe",
+    show_default=True,
+)
+@click.option("--output", type=click.Path(), required=False)
+@click.option("--info_fields", type=str, required=False)
+@click.option("--format_fields", type=str, required=False)
+@click.option(
+    "--samples",
+    type=str,
+    required=False,
+    help="Comma-separated samples to export FORMAT fields for.",
+)
+@click.option(
+    "--sort", is_flag=True, help="Sort by chrom_1, start_1, chrom_2, start_2."
+)
+@click.option(
+    "--sort_buffer",
+    type=ByteSize(),
+    default="256M",
+    show_default=True,
+    help="Memory used for sorting before spilling to temporary files.",
+)
+@click.option(
+    "--sort_order",
+    type=click.Choice(["name", "contig"]),
+    default="name",
+    show_default=True,
+    help="Sort chromosomes by name or in the order of the VCF header.",
+)
+@add_region_options
+@click.option(
+    "--components",
+    type=click.IntRange(min=0),
+    required=False,
+    help="Add rearrangement components joining breakends within this distance.",
+)
+@click.pass_context
+def create_bedpe(
+    ctx: click.Context,
+    vcf: str,
+    include_fields: Optional[str] = None,
+    output_format: str = "bedpe",
+    output: Optional[str] = None,
+    info_fields: Optional[str] = None,
+    format_fields: Optional[str] = None,
+    samples: Optional[str] = None,
+    sort: bool = False,
+    sort_buffer: int = DEFAULT_BUFFER_SIZE,
+    sort_order: str = "name",
+    include_bed: Optional[str] = None,
+    exclude_bed: Optional[str] = None,
+    components: Optional[int] = None,
+) -> None:
+    if output_format != "bedpe" and output is None:
+        raise click.UsageError(f"--output is required with --format {output_format}")
+    if output_format != "bedpe" and sort:
+        raise click.UsageError("--sort is only supported with --format bedpe")
+
+    from svtoolbox.export import convert_vcf
+
+    budget = memory_budget(ctx)
+    if budget.sort_buffer is not None:
+        sort_buffer = min(sort_buffer, budget.sort_buffer)
+
+    convert_vcf(
+        vcf,
+        output=output,
+        output_format=output_format,
+        include_fields=include_fields.split(",") if include_fields else None,
+        info_keys=info_fields.split(",") if info_fields else None,
+        format_keys=format_fields.split(",") if format_fields else None,
+        sort=sort,
+        sort_buffer=sort_buffer,
+        include=load_regions(include_bed),
+        exclude=load_regions(exclude_bed),
+        component_distance=components,
+        samples=samples.split(",") if samples else None,
+        sort_order=sort_order,
+        max_pending=budget.max_pending,
+        batch_size=budget.batch_size,
+    )
 
 
 @client.command()
 @click.option("--vcf", type=click.Path(exists=True), required=True)
-def create_contigs_fastq(vcf: str) -> None:
+@add_region_options
+@click.pass_context
+def create_contigs_fastq(
+    ctx: click.Context,
+    vcf: str,
+    include_bed: Optional[str] = None,
+    exclude_bed: Optional[str] = None,
+) -> None:
+    from svtoolbox.bed import filter_variants
+
+    include, exclude = load_regions(include_bed), load_regions(exclude_bed)
+    max_pending = memory_budget(ctx).max_pending
     with gzip.open(vcf, "rt") as stream:
-        for variant in parse_vcf(stream).values():
+        variants: Iterable[Variant]
+        if max_pending is not None:
+            reader = VcfReader(stream, samples=[])
+            variants = resolve_mates(reader, max_pending=max_pending)
+        else:
+            variants = parse_vcf(stream).values()
+        if include is not None or exclude is not None:
+            variants = filter_variants(variants, include=include, exclude=exclude)
+        for variant in variants:
             try:
                 contig = str(variant.get_info("CONTIG"))
                 print("\n".join([f"@{variant.id}", contig, "+", "I" * len(contig)]))
@@ -41,5 +218,342 @@ def create_contigs_fastq(vcf: str) -> None:
                 pass
 
 
+@client.command()
+@click.argument("vcfs", nargs=-1, type=click.Path(exists=True))
+@click.option("--vcf_list", type=click.File("r"), required=False)
+@click.option(
+    "--output_template", type=str, default=DEFAULT_TEMPLATE, show_default=True
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["bedpe", "parquet", "arrow"]),
+    default="bedpe",
+    show_default=True,
+)
+@click.option("--include_fields", type=str, required=False)
+@click.option("--jobs", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option("--manifest", type=click.Path(dir_okay=False), required=False)
+@click.option("--combined", type=click.Path(dir_okay=False), required=False)
+@click.pass_context
+def batch(
+    ctx: click.Context,
+    vcfs: Tuple[str, ...],
+    vcf_list: Optional[TextIO] = None,
+    output_template: str = DEFAULT_TEMPLATE,
+    output_format: str = "bedpe",
+    include_fields: Optional[str] = None,
+    jobs: int = 1,
+    manifest: Optional[str] = None,
+    combined: Optional[str] = None,
+) -> None:
+    """Convert many VCF files in one go. Inputs can be given as arguments
+    (directories are searched for gzipped VCF files) or listed one per line
+    in the file passed to --vcf_list. With --manifest, inputs that have not
+    changed since the previous run are skipped. With --combined, all BEDPE
+    outputs are also merged into a single file."""
+    from svtoolbox.batch import expand_inputs, output_path, run_batch
+    from svtoolbox.incremental import merge_outputs, run_incremental
+
+    paths = list(vcfs)
+    if vcf_list is not None:
+        paths.extend(line.strip() for line in vcf_list if line.strip())
+    inputs = expand_inputs(paths)
+    if not inputs:
+        raise click.UsageError("No VCF files given")
+
+    outputs = [output_path(vcf, output_template, output_format) for vcf in inputs]
+    if len(set(outputs)) != len(outputs):
+        raise click.UsageError("Output template maps several VCF files to one file")
+    if combined is not None and output_format != "bedpe":
+        raise click.UsageError("--combined is only supported with --format bedpe")
+
+    start = time.perf_counter()
+    failures = 0
+    skipped = 0
+    fields = include_fields.split(",") if include_fields else None
+    results: Iterator[Tuple["BatchResult", bool]]
+    if manifest is not None:
+        results = run_incremental(
+            inputs,
+            manifest_path=manifest,
+            template=output_template,
+            output_format=output_format,
+            include_fields=fields,
+            jobs=jobs,
+        )
+    else:
+        results = (
+            (result, False)
+            for result in run_batch(
+                inputs,
+                template=output_template,
+                output_format=output_format,
+                include_fields=fields,
+                jobs=jobs,
+            )
+        )
+    for done, (result, unchanged) in enumerate(results, start=1):
+        prefix = f"[{done}/{len(inputs)}] {result.vcf}"
+        if unchanged:
+            skipped += 1
+            click.echo(f"{prefix} unchanged, skipped", err=True)
+        elif result.ok:
+            click.echo(
+                f"{prefix} -> {result.output}: "
+                f"{result.variants} variants in {result.seconds:.2f} s",
+                err=True,
+            )
+        else:
+            failures += 1
+            click.echo(f"{prefix} FAILED: {result.error}", err=True)
+
+    click.echo(
+        f"Processed {len(inputs)} files in {time.perf_counter() - start:.2f} s "
+        f"({skipped} unchanged, {failures} failed)",
+        err=True,
+    )
+    if failures:
+        ctx.exit(1)
+
+    if combined is not None:
+        merge_outputs(outputs, combined)
+
+
+@client.command()
+@click.option("--vcf", type=click.Path(exists=True), required=True)
+@click.option("--output", type=click.Path(dir_okay=False), default="-")
+@click.option("--svlen", is_flag=True, help="Add SVLEN to variants with an END.")
+@click.option("--ci", is_flag=True, help="Add BEDPE-style CI bounds.")
+@click.option("--mate_end", is_flag=True, help="Add CHR2/POS2 to BND variants.")
+@click.option("--overlap_bed", type=click.Path(exists=True), required=False)
+@click.option("--overlap_key", type=str, default="BED_OVERLAP", show_default=True)
+@click.option(
+    "--components",
+    type=click.IntRange(min=0),
+    required=False,
+    help="Add rearrangement components joining breakends within this distance.",
+)
+@click.option("--threads", type=click.IntRange(min=1), default=1, show_default=True)
+@click.option("--index", is_flag=True, help="Create a tabix index of the output.")
+def annotate(
+    vcf: str,
+    output: str = "-",
+    svlen: bool = False,
+    ci: bool = False,
+    mate_end: bool = False,
+    overlap_bed: Optional[str] = None,
+    overlap_key: str = "BED_OVERLAP",
+    components: Optional[int] = None,
+    threads: int = 1,
+    index: bool = False,
+) -> None:
+    """Stream a VCF file and add INFO fields to each record. Output files
+    ending in .gz are BGZF compressed using the given number of threads."""
+    from svtoolbox.annotate import (
+        Annotator,
+        BedOverlapAnnotator,
+        ComponentAnnotator,
+        ConfidenceIntervalAnnotator,
+        MateEndAnnotator,
+        SvLenAnnotator,
+        annotate_vcf,
+    )
+    from svtoolbox.bed import BedIndex
+    from svtoolbox.bgzf import BgzfWriter
+    from svtoolbox.graph import rearrangement_components
+
+    compressed = output.endswith(".gz")
+    if index and not compressed:
+        raise click.UsageError("--index requires a BGZF output file ending in .gz")
+
+    # Mate positions go first, so the other annotators can use them
+    annotators: List[Annotator] = []
+    if mate_end:
+        annotators.append(MateEndAnnotator())
+    if svlen:
+        annotators.append(SvLenAnnotator())
+    if ci:
+        annotators.append(ConfidenceIntervalAnnotator())
+    if overlap_bed is not None:
+        annotators.append(
+            BedOverlapAnnotator(BedIndex.from_file(overlap_bed), key=overlap_key)
+        )
+    if components is not None:
+        # Components depend on the whole file, so they are found in a first pass
+        with gzip.open(vcf, "rt") as stream:
+            variants = parse_vcf(stream, samples=[]).values()
+            annotators.append(
+                ComponentAnnotator(rearrangement_components(variants, components))
+            )
+
+    with gzip.open(vcf, "rt") as stream:
+        if compressed:
+            with BgzfWriter(output, threads=threads) as writer:
+                annotate_vcf(stream, writer, annotators)
+        else:
+            with click.open_file(output, "w") as out:
+                annotate_vcf(stream, out, annotators)
+
+    if index:
+        import pysam
+
+        pysam.tabix_index(output, preset="vcf", force=True)
+
+
+@client.command()
+@click.option("--vcf", type=click.Path(exists=True), required=True)
+def stats(vcf: str) -> None:
+    """Print summary statistics as JSON."""
+    import json
+
+    from svtoolbox.stats import variant_stats
+
+    with gzip.open(vcf, "rt") as stream:
+        summary = variant_stats(VcfReader(stream, samples=[]))
+    click.echo(json.dumps(summary.to_dict(), indent=2))
+
+
+@client.command()
+@click.option("--vcf", type=click.Path(exists=True), required=True)
+@click.option("--output", type=click.Path(dir_okay=False), default="-")
+@click.option(
+    "--tolerance",
+    type=click.IntRange(min=0),
+    default=0,
+    show_default=True,
+    help="Maximum distance between confidence intervals of duplicate calls.",
+)
+@click.option(
+    "--key",
+    type=str,
+    default="QUAL",
+    show_default=True,
+    help="QUAL or a numeric INFO field used to pick the call to keep.",
+)
+@click.option(
+    "--report",
+    type=click.Path(dir_okay=False),
+    required=False,
+    help="Write duplicates and IDs shared by several records to a TSV file.",
+)
+def dedup(
+    vcf: str,
+    output: str = "-",
+    tolerance: int = 0,
+    key: str = "QUAL",
+    report: Optional[str] = None,
+) -> None:
+    """Collapse duplicate calls of the same SVTYPE with breakpoints within
+    tolerance of each other. The best call is kept, and the IDs of the
+    others are listed in its DUPLICATES INFO field."""
+    from svtoolbox.dedup import deduplicate_vcf
+
+    with gzip.open(vcf, "rt") as stream, click.open_file(output, "w") as out:
+        result = deduplicate_vcf(stream, out, tolerance=tolerance, key=key)
+
+    if report is not None:
+        with open(report, "w") as out:
+            result.write_report(out)
+
+    for name, variants in result.repeated_ids.items():
+        positions = ", ".join(str(variant.start) for variant in variants)
+        click.echo(
+            f"ID {name} is used by {len(variants)} records: {positions}", err=True
+        )
+    groups = result.groups
+    duplicates = sum(len(group.duplicates) for group in groups)
+    click.echo(f"Kept {len(groups)} calls, collapsed {duplicates} duplicates", err=True)
+
+
+@client.command()
+@click.argument("vcfs", nargs=-1, type=click.Path(exists=True))
+@click.option("--vcf_list", type=click.File("r"), required=False)
+@click.option("--output", type=click.Path(dir_okay=False), required=True)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["npz", "bedgraph"]),
+    default="npz",
+    show_default=True,
+)
+@click.option(
+    "--bin_size",
+    type=click.IntRange(min=1),
+    default=DEFAULT_BIN_SIZE,
+    show_default=True,
+)
+@click.option("--jobs", type=click.IntRange(min=1), default=1, show_default=True)
+def density(
+    vcfs: Tuple[str, ...],
+    output: str,
+    vcf_list: Optional[TextIO] = None,
+    output_format: str = "npz",
+    bin_size: int = DEFAULT_BIN_SIZE,
+    jobs: int = 1,
+) -> None:
+    """Count breakpoints in fixed-size bins along each contig, summed over
+    all input files. Each breakpoint is counted at the midpoint of its
+    confidence interval. Requires numpy."""
+    from svtoolbox.batch import expand_inputs
+    from svtoolbox.density import accumulate_density
+
+    paths = list(vcfs)
+    if vcf_list is not None:
+        paths.extend(line.strip() for line in vcf_list if line.strip())
+    inputs = expand_inputs(paths)
+    if not inputs:
+        raise click.UsageError("No VCF files given")
+
+    counts = accumulate_density(inputs, bin_size=bin_size, jobs=jobs)
+    if output_format == "npz":
+        counts.save_npz(output)
+    else:
+        with click.open_file(output, "w") as out:
+            counts.write_bedgraph(out)
+    click.echo(f"Counted {counts.total} breakpoints from {len(inputs)} files", err=True)
+
+
+@client.command("extract-flanks")
+@click.option("--vcf", type=click.Path(exists=True), required=True)
+@click.option(
+    "--reference",
+    type=click.Path(exists=True, dir_okay=False),
+    required=True,
+    help="Indexed FASTA file of the reference genome.",
+)
+@click.option("--output", type=click.Path(dir_okay=False), default="-")
+@click.option(
+    "--flank",
+    type=click.IntRange(min=0),
+    default=DEFAULT_FLANK,
+    show_default=True,
+    help="Bases to include on both sides of each confidence interval.",
+)
+@click.option("--jobs", type=click.IntRange(min=1), default=1, show_default=True)
+@add_region_options
+def extract_flanks_command(
+    vcf: str,
+    reference: str,
+    output: str = "-",
+    flank: int = DEFAULT_FLANK,
+    jobs: int = 1,
+    include_bed: Optional[str] = None,
+    exclude_bed: Optional[str] = None,
+) -> None:
+    """Write the reference sequence around the start and end of each
+    variant as FASTA records named ID_start and ID_end."""
+    from svtoolbox.bed import filter_variants
+    from svtoolbox.flanks import extract_flanks
+
+    include, exclude = load_regions(include_bed), load_regions(exclude_bed)
+    with gzip.open(vcf, "rt") as stream:
+        variants: Iterable[Variant] = parse_vcf(stream, samples=[]).values()
+        if include is not None or exclude is not None:
+            variants = filter_variants(variants, include=include, exclude=exclude)
+        with click.open_file(output, "w") as out:
+            extract_flanks(variants, reference, out, flank=flank, jobs=jobs)
+
+
 def run():
     client()
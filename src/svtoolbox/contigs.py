@@ -0,0 +1,89 @@
+import re
+import sys
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+HEADER_ID = re.compile(r"[<,]ID=([^,>]+)")
+CONTIG_LENGTH = re.compile(r"[<,]length=(\d+)")
+
+
+def header_id(line: str, kind: str = "INFO") -> Optional[str]:
+    """Return the ID of a structured header line of the given kind, such as
+    END for ##INFO=<ID=END,Number=1,...>. Return None for other lines."""
+    if not line.startswith(f"##{kind}=<"):
+        return None
+    match = HEADER_ID.search(line)
+    return match.group(1) if match else None
+
+
+@dataclass
+class Contig:
+    name: str
+    id: int
+    length: Optional[int] = None
+
+
+class ContigDictionary:
+    """Contigs in the order they are declared in the VCF header, with an
+    integer ID and length for each. Names are interned, so all variants on
+    a contig share one string object, and comparing names is an identity
+    check. Contigs missing from the header are added when first seen,
+    after the declared ones and without a length."""
+
+    def __init__(self) -> None:
+        self._contigs: List[Contig] = []
+        self._by_name: Dict[str, Contig] = {}
+
+    @classmethod
+    def from_header(cls, header: Iterable[str]) -> "ContigDictionary":
+        """Read ##contig lines such as ##contig=<ID=chr1,length=248956422>."""
+        contigs = cls()
+        for line in header:
+            name = header_id(line, "contig")
+            if name is None:
+                continue
+            length = CONTIG_LENGTH.search(line)
+            contigs.add(name, int(length.group(1)) if length else None)
+        return contigs
+
+    def add(self, name: str, length: Optional[int] = None) -> Contig:
+        contig = self._by_name.get(name)
+        if contig is None:
+            contig = Contig(name=sys.intern(name), id=len(self._contigs), length=length)
+            self._contigs.append(contig)
+            self._by_name[contig.name] = contig
+        elif length is not None:
+            contig.length = length
+        return contig
+
+    def intern(self, name: str) -> str:
+        """Return the shared string object for the contig name."""
+        contig = self._by_name.get(name)
+        return contig.name if contig is not None else self.add(name).name
+
+    def id(self, name: str) -> int:
+        contig = self._by_name.get(name)
+        return contig.id if contig is not None else self.add(name).id
+
+    def length(self, name: str) -> Optional[int]:
+        contig = self._by_name.get(name)
+        return contig.length if contig is not None else None
+
+    def contains_position(self, name: str, pos: int) -> bool:
+        """Check that a 1-based position lies on the contig. Positions on
+        contigs of unknown length are always accepted."""
+        length = self.length(name)
+        return length is None or 0 <= pos <= length
+
+    def name(self, id: int) -> str:
+        return self._contigs[id].name
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._by_name
+
+    def __iter__(self) -> Iterator[Contig]:
+        return iter(self._contigs)
+
+    def __len__(self) -> int:
+        return len(self._contigs)
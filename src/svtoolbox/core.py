@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Union
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from svtoolbox.exceptions import (
     FieldNotFound,
@@ -8,6 +8,9 @@ from svtoolbox.exceptions import (
     MissingMate,
 )
 
+if TYPE_CHECKING:
+    from svtoolbox.callers import Decoder
+
 
 @dataclass
 class Position:
@@ -114,6 +117,10 @@ class Variant:
     # The mate variant of a BND variant
     mate: Optional["Variant"] = None
 
+    # Caller-specific rules for END, mates and confidence intervals. If
+    # not set, the generic rules below are used.
+    decoder: Optional["Decoder"] = field(default=None, compare=False, repr=False)
+
     def __post_init__(self) -> None:
         """Gather INFO and FORMAT values in dictionaries. This is convenient
         for looking values up later. There is one dictionary for INFO fields
@@ -147,17 +154,21 @@ class Variant:
                 self.alt,
                 self.qual,
                 self.filter,
-                ";".join(
-                    [
-                        f"{key}={value}" if isinstance(value, str) else key
-                        for key, value in self.info_dict.items()
-                    ]
-                ),
+                self.format_info(),
                 self.format,
                 *self.genotypes.values(),
             ]
         )
 
+    def format_info(self) -> str:
+        """Return the INFO column built from the INFO dictionary."""
+        return ";".join(
+            [
+                f"{key}={value}" if isinstance(value, str) else key
+                for key, value in self.info_dict.items()
+            ]
+        )
+
     def get_info(self, key: str) -> Union[str, bool]:
         """Return the value of the INFO field with the given key. If the key
         is a flag, return True. If the key is not found, raise an exception."""
@@ -192,6 +203,8 @@ class Variant:
         """Return the end position of the variant. For BND variants, this
         is the start position of the mate. For all other variants, the
         end position is specified in the END info field."""
+        if self.decoder is not None:
+            return self.decoder.end(self)
         if self.get_info("SVTYPE") == "BND":
             # This is the style used by Delly
             try:
@@ -205,11 +218,24 @@ class Variant:
             return self.mate.start
         return Position(self.chrom, int(self.get_info("END")))
 
+    @property
+    def alt_mate(self) -> Optional[Position]:
+        """Return the mate position encoded in a breakend ALT allele such
+        as G]chr2:200] or [chr4:400[A. If the ALT allele is not a breakend,
+        return None."""
+        for bracket in "[]":
+            if self.alt.count(bracket) == 2:
+                chrom, pos = self.alt.split(bracket)[1].rsplit(":", 1)
+                return Position(chrom, int(pos))
+        return None
+
     @property
     def ci_start(self) -> Interval:
         """Return confidence interval for the start position. If the CIPOS
         info field is not found, return an interval with the start position
         as both left and right."""
+        if self.decoder is not None:
+            return self.decoder.ci_start(self)
         try:
             left, right = str(self.get_info("CIPOS")).split(",")
             return Interval(
@@ -231,6 +257,8 @@ class Variant:
         as both left and right. For BND variants, the confidence interval
         of the end poistion is the same as the confidence interval of the
         start position of the mate."""
+        if self.decoder is not None:
+            return self.decoder.ci_end(self)
         if self.get_info("SVTYPE") == "BND" and self.mate is not None:
             return self.mate.ci_start
         try:
@@ -0,0 +1,203 @@
+from dataclasses import dataclass, field
+from typing import IO, Callable, Dict, Iterable, List, Optional, Tuple
+
+from svtoolbox.annotate import Annotator, InfoValue, annotate_record, annotated_header
+from svtoolbox.bed import breakpoint_intervals
+from svtoolbox.core import Interval, Variant
+from svtoolbox.parser import MateResolver, VcfReader
+
+
+@dataclass
+class DuplicateGroup:
+    """A variant which was kept, and the variants found to duplicate it."""
+
+    kept: Variant
+    duplicates: List[Variant] = field(default_factory=list)
+
+    @property
+    def duplicate_ids(self) -> List[str]:
+        return [variant.id for variant in self.duplicates]
+
+
+class DuplicatesAnnotator(Annotator):
+    """Add the IDs of the duplicates collapsed into each kept variant."""
+
+    header_lines = [
+        '##INFO=<ID=DUPLICATES,Number=.,Type=String,Description="IDs of duplicate calls collapsed into this one">'
+    ]
+
+    def __init__(self, groups: Iterable[DuplicateGroup]) -> None:
+        self.duplicates = {id(group.kept): group.duplicate_ids for group in groups}
+
+    def annotate(self, variant: Variant) -> Dict[str, InfoValue]:
+        ids = self.duplicates.get(id(variant))
+        return {"DUPLICATES": ",".join(ids)} if ids else {}
+
+
+@dataclass
+class DedupResult:
+    """The duplicate groups found by deduplicate_vcf, and the records of
+    each ID used by more than one record in the input."""
+
+    groups: List[DuplicateGroup]
+    repeated_ids: Dict[str, List[Variant]] = field(default_factory=dict)
+
+    def write_report(self, out: IO) -> None:
+        """Write a TSV with one row per collapsed duplicate and one row per
+        record with a repeated ID. Records are given as CHROM:POS next to
+        their ID, so that records sharing an ID can be told apart."""
+        out.write("ID\tPOSITION\tREASON\tKEPT\tKEPT_POSITION\n")
+        for group in self.groups:
+            kept = group.kept
+            for variant in group.duplicates:
+                row = [variant.id, variant.start, "duplicate", kept.id, kept.start]
+                out.write("\t".join(map(str, row)) + "\n")
+        for name, variants in self.repeated_ids.items():
+            for variant in variants:
+                row = [name, variant.start, "repeated_id", ".", "."]
+                out.write("\t".join(map(str, row)) + "\n")
+
+
+def score_function(key: str = "QUAL") -> Callable[[Variant], float]:
+    """Return a function scoring variants by QUAL, or by a numeric INFO
+    field. Variants where the value is missing get the lowest score."""
+
+    def score(variant: Variant) -> float:
+        value = variant.qual if key == "QUAL" else variant.info_dict.get(key)
+        if not isinstance(value, str) or value == ".":
+            return float("-inf")
+        return float(value.split(",", 1)[0])
+
+    return score
+
+
+def breakpoints(variant: Variant) -> Tuple[Interval, Optional[Interval]]:
+    """Return the confidence intervals of both breakpoints, where the end
+    is None for variants without one."""
+    intervals = breakpoint_intervals(variant)
+    return intervals[0], intervals[1] if len(intervals) > 1 else None
+
+
+def within(first: Interval, second: Interval, tolerance: int) -> bool:
+    """Return True if the intervals overlap after widening by tolerance."""
+    return (
+        first.chrom == second.chrom
+        and first.left - tolerance <= second.right
+        and second.left - tolerance <= first.right
+    )
+
+
+def find_duplicates(
+    variants: Iterable[Variant],
+    tolerance: int = 0,
+    score: Optional[Callable[[Variant], float]] = None,
+) -> List[DuplicateGroup]:
+    """Group variants of the same SVTYPE whose start and end confidence
+    intervals are identical or within tolerance of each other, and return
+    one group per distinct call in input order. The best variant by score
+    is kept, and ties go to the variant seen first. By default variants
+    are scored by QUAL.
+
+    Variants are sorted by chromosome, SVTYPE and start, and swept in that
+    order. Each variant is only compared with the groups whose first
+    variant it could still be near, so the sweep stays linear in practice.
+    Variants are compared with the first variant of a group, which keeps
+    chains of nearby calls from collapsing into one."""
+
+    if score is None:
+        score = score_function()
+
+    records = []
+    for index, variant in enumerate(variants):
+        start, end = breakpoints(variant)
+        svtype = str(variant.info_dict.get("SVTYPE", ""))
+        records.append((start.chrom, svtype, start.left, index, variant, start, end))
+    records.sort(key=lambda record: record[:4])
+
+    # Index of the first variant, its breakpoints and members of each group
+    groups: List[
+        Tuple[int, Interval, Optional[Interval], List[Tuple[int, Variant]]]
+    ] = []
+    active: List[int] = []
+    previous: Tuple[str, str] = ("", "")
+
+    for chrom, svtype, left, index, variant, start, end in records:
+        if (chrom, svtype) != previous:
+            active, previous = [], (chrom, svtype)
+        # Groups which end before this variant can not take any later one
+        active = [
+            group for group in active if groups[group][1].right + tolerance >= left
+        ]
+        for group in active:
+            _, first_start, first_end, _ = groups[group]
+            if not within(first_start, start, tolerance):
+                continue
+            if first_end is None or end is None:
+                if first_end is end:
+                    break
+                continue
+            if within(first_end, end, tolerance):
+                break
+        else:
+            group = len(groups)
+            groups.append((index, start, end, []))
+            active.append(group)
+        groups[group][3].append((index, variant))
+
+    result: List[DuplicateGroup] = []
+    for _, _, _, members in sorted(groups, key=lambda group: group[0]):
+        # max returns the first of equal elements, so ties go to the earliest
+        ordered = [variant for _, variant in sorted(members, key=lambda m: m[0])]
+        best = max(ordered, key=score)
+        result.append(
+            DuplicateGroup(
+                kept=best,
+                duplicates=[variant for variant in ordered if variant is not best],
+            )
+        )
+    return result
+
+
+def deduplicate_vcf(
+    stream: Iterable[str],
+    out: IO,
+    tolerance: int = 0,
+    key: str = "QUAL",
+) -> DedupResult:
+    """Write the kept variants of a VCF file in their original order, with
+    the IDs of their duplicates in a DUPLICATES INFO field, and return the
+    duplicate groups. Genotype columns are passed through as is. IDs used
+    by more than one record are returned as well, since they are written
+    as they are rather than dropped."""
+    reader = VcfReader(stream, samples=[])
+    records = list(reader.records())
+
+    # Records are kept in a list rather than by ID, so calls sharing an ID
+    # are not lost. Mates are only linked for the breakpoint positions.
+    resolver = MateResolver()
+    by_id: Dict[str, List[Variant]] = {}
+    for _, variant in records:
+        resolver.add(variant)
+        by_id.setdefault(variant.id, []).append(variant)
+    resolver.finish()
+
+    groups = find_duplicates(
+        (variant for _, variant in records),
+        tolerance=tolerance,
+        score=score_function(key),
+    )
+    kept = {id(group.kept) for group in groups}
+    annotators: List[Annotator] = [DuplicatesAnnotator(groups)]
+    for line in annotated_header(reader.header, annotators):
+        out.write(f"{line}\n")
+    for line, variant in records:
+        if id(variant) in kept:
+            out.write(annotate_record(line, variant, annotators))
+    return DedupResult(
+        groups=groups,
+        repeated_ids={
+            name: variants
+            for name, variants in by_id.items()
+            if len(variants) > 1 and name != "."
+        },
+    )
@@ -0,0 +1,163 @@
+import gzip
+
+from array import array
+from dataclasses import dataclass, field
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple
+
+from svtoolbox.bed import breakpoint_intervals
+from svtoolbox.core import Interval, Variant
+from svtoolbox.dependencies import import_numpy
+from svtoolbox.parser import VcfReader
+
+DEFAULT_BIN_SIZE = 100_000
+
+
+@dataclass
+class BreakpointDensity:
+    """Breakpoint counts in fixed-size bins along each contig. Bin i of a
+    contig covers the 1-based positions i * bin_size + 1 to (i + 1) *
+    bin_size, and the counts are int64 arrays with one entry per bin."""
+
+    bin_size: int = DEFAULT_BIN_SIZE
+    counts: Dict[str, Any] = field(default_factory=dict)
+
+    def add(self, chrom: str, counts: Any) -> None:
+        """Add counts for a contig. Arrays of different lengths are padded,
+        since contigs without a length are only as long as their last bin
+        with a breakpoint."""
+        np = import_numpy()
+        existing = self.counts.get(chrom)
+        if existing is None:
+            self.counts[chrom] = np.array(counts, dtype=np.int64)
+            return
+        if len(existing) < len(counts):
+            existing = np.pad(existing, (0, len(counts) - len(existing)))
+        existing[: len(counts)] += counts
+        self.counts[chrom] = existing
+
+    def merge(self, other: "BreakpointDensity") -> None:
+        if other.bin_size != self.bin_size:
+            raise ValueError(
+                f"Cannot merge bin sizes {other.bin_size} and {self.bin_size}"
+            )
+        for chrom, counts in other.counts.items():
+            self.add(chrom, counts)
+
+    @property
+    def total(self) -> int:
+        return sum(int(counts.sum()) for counts in self.counts.values())
+
+    def save_npz(self, path: str) -> None:
+        """Write one compressed array per contig. Contig names are stored
+        separately, because they need not be valid array names."""
+        np = import_numpy()
+        chroms = list(self.counts)
+        arrays = {f"counts_{i}": self.counts[chrom] for i, chrom in enumerate(chroms)}
+        np.savez_compressed(
+            path,
+            bin_size=np.array(self.bin_size),
+            chroms=np.array(chroms, dtype=str),
+            **arrays,
+        )
+
+    @classmethod
+    def load_npz(cls, path: str) -> "BreakpointDensity":
+        np = import_numpy()
+        with np.load(path) as data:
+            density = cls(bin_size=int(data["bin_size"]))
+            for i, chrom in enumerate(data["chroms"]):
+                density.counts[str(chrom)] = data[f"counts_{i}"]
+        return density
+
+    def write_bedgraph(self, stream: IO) -> int:
+        """Write the bins with at least one breakpoint as 0-based bedGraph
+        intervals, and return the number of lines written."""
+        np = import_numpy()
+        lines = 0
+        for chrom, counts in self.counts.items():
+            for index in np.flatnonzero(counts):
+                start = int(index) * self.bin_size
+                stream.write(
+                    f"{chrom}\t{start}\t{start + self.bin_size}\t{counts[index]}\n"
+                )
+                lines += 1
+        return lines
+
+
+def breakpoints(variant: Variant) -> List[Interval]:
+    """Return the confidence intervals of the breakpoints of a variant. A
+    BND record with a MATEID only contributes its own breakend, since its
+    mate record contributes the other one. A BND without a mate record, as
+    written by Delly, contributes both. An insertion has one breakpoint."""
+    info = variant.info_dict
+    svtype = info.get("SVTYPE")
+    if svtype == "INS" or (svtype == "BND" and "MATEID" in info):
+        return [variant.ci_start]
+    return breakpoint_intervals(variant)
+
+
+def breakpoint_density(
+    variants: Iterable[Variant],
+    bin_size: int = DEFAULT_BIN_SIZE,
+    lengths: Optional[Dict[str, int]] = None,
+) -> BreakpointDensity:
+    """Count the confidence interval midpoints of all breakpoints in bins.
+    The interval bounds are collected in compact integer arrays per contig,
+    and midpoints and bins are computed for each contig at once with
+    NumPy. Contigs with a known length get bins covering all of it."""
+    np = import_numpy()
+    lengths = lengths or {}
+
+    bounds: Dict[str, Tuple[array, array]] = {}
+    for variant in variants:
+        for interval in breakpoints(variant):
+            lefts, rights = bounds.setdefault(interval.chrom, (array("q"), array("q")))
+            lefts.append(interval.left)
+            rights.append(interval.right)
+
+    density = BreakpointDensity(bin_size=bin_size)
+    for chrom in list(lengths) + [chrom for chrom in bounds if chrom not in lengths]:
+        length = lengths.get(chrom)
+        size = -(-length // bin_size) if length is not None else 0
+        bins = np.zeros(0, dtype=np.int64)
+        if chrom in bounds:
+            lefts, rights = (np.frombuffer(b, dtype=np.int64) for b in bounds[chrom])
+            # Positions are 1-based, and intervals may reach past the ends
+            bins = np.maximum((lefts + rights) // 2 - 1, 0) // bin_size
+            size = max(size, int(bins.max()) + 1)
+        if size:
+            density.add(chrom, np.bincount(bins, minlength=size))
+    return density
+
+
+def vcf_density(vcf: str, bin_size: int = DEFAULT_BIN_SIZE) -> BreakpointDensity:
+    """Count breakpoints in a gzipped VCF file, with contig lengths taken
+    from its ##contig header lines."""
+    with gzip.open(vcf, "rt") as stream:
+        reader = VcfReader(stream, samples=[])
+        lengths = {
+            contig.name: contig.length
+            for contig in reader.contigs
+            if contig.length is not None
+        }
+        return breakpoint_density(reader, bin_size=bin_size, lengths=lengths)
+
+
+def accumulate_density(
+    vcfs: List[str], bin_size: int = DEFAULT_BIN_SIZE, jobs: int = 1
+) -> BreakpointDensity:
+    """Count breakpoints over many VCF files. With more than one job, the
+    files are counted in a process pool, and the arrays are summed in the
+    main process."""
+    density = BreakpointDensity(bin_size=bin_size)
+    if jobs == 1:
+        for vcf in vcfs:
+            density.merge(vcf_density(vcf, bin_size))
+        return density
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for result in executor.map(vcf_density, vcfs, [bin_size] * len(vcfs)):
+            density.merge(result)
+    return density
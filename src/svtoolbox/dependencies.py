@@ -0,0 +1,24 @@
+import importlib
+
+from typing import Any
+
+from svtoolbox.exceptions import MissingDependency
+
+
+def import_optional(name: str) -> Any:
+    """Import an optional dependency on demand, raising MissingDependency
+    with the package name if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise MissingDependency(name)
+
+
+def import_numpy() -> Any:
+    """numpy is needed for genotype arrays and breakpoint density."""
+    return import_optional("numpy")
+
+
+def import_pyarrow() -> Any:
+    """pyarrow is needed to export variants to Arrow or Parquet."""
+    return import_optional("pyarrow")
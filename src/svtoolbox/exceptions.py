@@ -16,3 +16,15 @@ class GenotypeFieldNotFound(SVToolBoxException):
 
 class MissingMate(SVToolBoxException):
     pass
+
+
+class MissingDependency(SVToolBoxException):
+    pass
+
+
+class SampleNotFound(SVToolBoxException):
+    pass
+
+
+class PositionOutOfRange(SVToolBoxException):
+    pass
@@ -0,0 +1,148 @@
+import gzip
+import sys
+
+from typing import Iterable, List, Optional, TextIO
+
+from svtoolbox.bed import BedIndex, filter_variants
+from svtoolbox.contigs import ContigDictionary
+from svtoolbox.core import BedPE, Variant
+from svtoolbox.graph import rearrangement_components
+from svtoolbox.parser import VcfReader, link_mates, resolve_mates
+from svtoolbox.sort import DEFAULT_BUFFER_SIZE, sort_bedpe
+
+
+def to_bedpe(
+    variant: Variant,
+    include_fields: Optional[List[str]] = None,
+    info_keys: Optional[List[str]] = None,
+) -> BedPE:
+    """Create the BEDPE representation of a variant with the given INFO
+    values added to the extra fields. Flags are given the value true, and
+    missing values are written as a dot."""
+    bedpe = variant.to_bedpe(include_fields=include_fields)
+    if info_keys:
+        fields = bedpe.fields or {}
+        for key in info_keys:
+            value = variant.info_dict.get(key, ".")
+            fields[key] = "true" if value is True else str(value)
+        bedpe.fields = fields
+    return bedpe
+
+
+def write_bedpe(
+    variants: Iterable[Variant],
+    stream: TextIO,
+    include_fields: Optional[List[str]] = None,
+    sort: bool = False,
+    sort_buffer: int = DEFAULT_BUFFER_SIZE,
+    info_keys: Optional[List[str]] = None,
+    contigs: Optional[ContigDictionary] = None,
+) -> int:
+    """Write variants in BEDPE format and return the number of lines written.
+    If sort is True, lines are sorted by (chrom_1, start_1, chrom_2, start_2)
+    using an external merge sort with a memory budget of sort_buffer bytes.
+    Chromosomes are sorted by name, or in contig order if contigs are given."""
+    bedpes = (to_bedpe(variant, include_fields, info_keys) for variant in variants)
+    lines = 0
+    for line in (
+        sort_bedpe(bedpes, buffer_size=sort_buffer, contigs=contigs)
+        if sort
+        else map(str, bedpes)
+    ):
+        stream.write(f"{line}\n")
+        lines += 1
+    return lines
+
+
+def convert_vcf(
+    vcf: str,
+    output: Optional[str] = None,
+    output_format: str = "bedpe",
+    include_fields: Optional[List[str]] = None,
+    info_keys: Optional[List[str]] = None,
+    format_keys: Optional[List[str]] = None,
+    sort: bool = False,
+    sort_buffer: int = DEFAULT_BUFFER_SIZE,
+    include: Optional[BedIndex] = None,
+    exclude: Optional[BedIndex] = None,
+    component_distance: Optional[int] = None,
+    samples: Optional[List[str]] = None,
+    sort_order: str = "name",
+    max_pending: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> int:
+    """Convert a gzipped VCF file to BEDPE, Parquet or Arrow and return the
+    number of variants written. BEDPE is written to standard output if no
+    output path is given. Sorting is only supported for BEDPE. Variants are
+    filtered on the include and exclude regions before they are converted.
+    If a component distance is given, the rearrangement component of each
+    variant is added as the COMPONENT INFO field. FORMAT values are only
+    exported for the given samples (all samples by default), and unknown
+    samples raise SampleNotFound. The sort order of chromosomes is either
+    "name" or "contig" (the VCF header order).
+
+    With max_pending, variants are streamed instead of read into memory
+    first, and BND variants waiting for their mate are spilled to disk
+    beyond that number. Components still need the whole file. batch_size
+    sets the number of rows in each Parquet or Arrow batch."""
+
+    # Genotypes are only needed when FORMAT values are exported. Samples
+    # that were asked for are still selected, which checks their names.
+    if not format_keys and samples is None:
+        samples = []
+
+    with gzip.open(vcf, "rt") as stream:
+        reader = VcfReader(stream, samples=samples)
+        variants: Iterable[Variant]
+        if max_pending is not None and component_distance is None:
+            variants = resolve_mates(reader, max_pending=max_pending)
+        else:
+            variants = link_mates(reader).values()
+        contigs = reader.contigs if sort_order == "contig" else None
+        if component_distance is not None:
+            components = rearrangement_components(variants, component_distance)
+            for variant in variants:
+                variant.set_info("COMPONENT", str(components[variant.id]))
+            info_keys = (info_keys or []) + ["COMPONENT"]
+        if include is not None or exclude is not None:
+            variants = filter_variants(variants, include=include, exclude=exclude)
+
+        if output_format == "bedpe":
+            if output is None:
+                return write_bedpe(
+                    variants,
+                    sys.stdout,
+                    include_fields,
+                    sort,
+                    sort_buffer,
+                    info_keys,
+                    contigs,
+                )
+            with open(output, "w") as out:
+                return write_bedpe(
+                    variants,
+                    out,
+                    include_fields,
+                    sort,
+                    sort_buffer,
+                    info_keys,
+                    contigs,
+                )
+
+        if output is None:
+            raise ValueError(f"An output path is required for {output_format}")
+        if sort:
+            raise ValueError(f"Sorting is not supported for {output_format}")
+
+        from svtoolbox.arrow import DEFAULT_BATCH_SIZE, info_types, write_arrow
+
+        return write_arrow(
+            variants,
+            path=output,
+            file_format=output_format,
+            info_keys=info_keys,
+            format_keys=format_keys,
+            samples=samples,
+            batch_size=batch_size or DEFAULT_BATCH_SIZE,
+            types=info_types(reader.header),
+        )
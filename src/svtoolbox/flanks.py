@@ -0,0 +1,184 @@
+import bisect
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import IO, TYPE_CHECKING, Dict, Iterable, List, Tuple
+
+from svtoolbox.core import Interval, Variant
+from svtoolbox.exceptions import InfoFieldNotFound, MissingMate
+
+if TYPE_CHECKING:
+    # Importing pysam is slow, so it is only imported when sequences are read
+    from pysam import FastaFile
+
+DEFAULT_FLANK = 500
+
+# Reference sequence is read in blocks of this size, and up to
+# DEFAULT_CACHE_BLOCKS blocks are kept per chromosome
+DEFAULT_BLOCK_SIZE = 1 << 16
+DEFAULT_CACHE_BLOCKS = 64
+
+
+@dataclass
+class Window:
+    """A 0-based, half-open reference window around one breakpoint."""
+
+    name: str
+    chrom: str
+    start: int
+    end: int
+
+
+def breakpoint_windows(variant: Variant, flank: int = DEFAULT_FLANK) -> List[Window]:
+    """Return windows reaching flank bases beyond the confidence interval of
+    each breakpoint, named by variant ID and side. Variants without a known
+    end only get a window around the start."""
+    intervals: List[Tuple[str, Interval]] = [("start", variant.ci_start)]
+    try:
+        intervals.append(("end", variant.ci_end))
+    except (InfoFieldNotFound, MissingMate):
+        pass
+    return [
+        Window(
+            name=f"{variant.id}_{side}",
+            chrom=interval.chrom,
+            start=max(interval.left - 1 - flank, 0),
+            end=interval.right + flank,
+        )
+        for side, interval in intervals
+    ]
+
+
+def merge_windows(windows: Iterable[Window]) -> List[Tuple[int, int]]:
+    """Return the sorted spans covered by windows on one chromosome, with
+    overlapping and adjacent windows merged."""
+    spans: List[Tuple[int, int]] = []
+    for window in sorted(windows, key=lambda window: window.start):
+        if spans and window.start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], window.end))
+        else:
+            spans.append((window.start, window.end))
+    return spans
+
+
+class BlockCache:
+    """Least recently used cache of fixed-size reference blocks. Windows
+    are read through the cache, so nearby windows share the blocks they
+    overlap instead of each seeking in the FASTA file."""
+
+    def __init__(
+        self,
+        fasta: "FastaFile",
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        max_blocks: int = DEFAULT_CACHE_BLOCKS,
+    ) -> None:
+        self.fasta = fasta
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.blocks: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self.reads = 0
+
+    def block(self, chrom: str, index: int) -> str:
+        key = (chrom, index)
+        sequence = self.blocks.get(key)
+        if sequence is not None:
+            self.blocks.move_to_end(key)
+            return sequence
+        start = index * self.block_size
+        sequence = self.fasta.fetch(chrom, start, start + self.block_size)
+        self.reads += 1
+        self.blocks[key] = sequence
+        if len(self.blocks) > self.max_blocks:
+            self.blocks.popitem(last=False)
+        return sequence
+
+    def fetch(self, chrom: str, start: int, end: int) -> str:
+        """Return the 0-based, half-open sequence, cut short at the end of
+        the chromosome."""
+        first, last = start // self.block_size, (end - 1) // self.block_size
+        sequence = "".join(self.block(chrom, index) for index in range(first, last + 1))
+        offset = start - first * self.block_size
+        return sequence[offset : offset + end - start]
+
+
+def fetch_chromosome(
+    reference: str,
+    chrom: str,
+    windows: List[Window],
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    max_blocks: int = DEFAULT_CACHE_BLOCKS,
+) -> List[str]:
+    """Read the sequence of each window on one chromosome. The merged spans
+    are read in order through a block cache, and the windows are cut out
+    of the spans. Windows on chromosomes missing from the reference get an
+    empty sequence."""
+    import pysam
+
+    with pysam.FastaFile(reference) as fasta:
+        if chrom not in fasta.references:
+            return ["" for _ in windows]
+        cache = BlockCache(fasta, block_size=block_size, max_blocks=max_blocks)
+        spans = merge_windows(windows)
+        sequences = [cache.fetch(chrom, start, end) for start, end in spans]
+
+    starts = [start for start, _ in spans]
+    result: List[str] = []
+    for window in windows:
+        # The span containing a window is the last one starting before it
+        index = bisect.bisect_right(starts, window.start) - 1
+        offset = window.start - starts[index]
+        result.append(sequences[index][offset : offset + window.end - window.start])
+    return result
+
+
+def extract_flanks(
+    variants: Iterable[Variant],
+    reference: str,
+    out: IO,
+    flank: int = DEFAULT_FLANK,
+    jobs: int = 1,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> int:
+    """Write the reference sequence around each breakpoint as FASTA records
+    named ID_start and ID_end, in the order of the variants, and return the
+    number of records written. Windows are grouped by chromosome, and with
+    more than one job the chromosomes are read in a process pool. If the
+    pool breaks, the chromosomes not read yet are read in this process."""
+    windows: Dict[str, List[Window]] = {}
+    order: List[Tuple[str, int]] = []
+    for variant in variants:
+        for window in breakpoint_windows(variant, flank):
+            chrom_windows = windows.setdefault(window.chrom, [])
+            order.append((window.chrom, len(chrom_windows)))
+            chrom_windows.append(window)
+
+    sequences: Dict[str, List[str]] = {}
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                chrom: executor.submit(
+                    fetch_chromosome, reference, chrom, chrom_windows, block_size
+                )
+                for chrom, chrom_windows in windows.items()
+            }
+            for chrom, future in futures.items():
+                try:
+                    sequences[chrom] = future.result()
+                except BrokenProcessPool:
+                    # A worker died, for example killed for running out of
+                    # memory, and took the pool with it. The chromosomes
+                    # left are read in this process instead.
+                    break
+
+    for chrom, chrom_windows in windows.items():
+        if chrom not in sequences:
+            sequences[chrom] = fetch_chromosome(
+                reference, chrom, chrom_windows, block_size
+            )
+
+    for chrom, index in order:
+        out.write(f">{windows[chrom][index].name}\n{sequences[chrom][index]}\n")
+    return len(order)
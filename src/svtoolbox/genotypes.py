@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from svtoolbox.dependencies import import_numpy
+from svtoolbox.exceptions import SampleNotFound
+
+DEFAULT_KEYS = ("GT", "PR", "SR")
+
+# Number of variants held in each chunk when no chunk size is given
+DEFAULT_CHUNK_SIZE = 65536
+
+
+@dataclass
+class GenotypeMatrix:
+    """Dense FORMAT values for a block of variants and a set of samples.
+    Every array has shape (variants, samples, 2). GT holds int8 allele
+    codes, and all other keys hold int32 ref/alt pairs such as the PR and
+    SR counts reported by Manta. Missing values are stored as -1."""
+
+    ids: List[str]
+    samples: List[str]
+    arrays: Dict[str, Any]
+
+    def __getitem__(self, key: str) -> Any:
+        return self.arrays[key]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _gt_text(value: str) -> str:
+    """Rewrite a GT value such as 0|1, ./. or 1 to a/b with -1 for missing."""
+    value = value.replace("|", "/")
+    if "/" not in value:
+        value = f"{value}/."
+    return value.replace(".", "-1")
+
+
+def _pair_text(value: str) -> str:
+    """Rewrite a ref,alt pair. Anything but two values counts as missing."""
+    if value.count(",") != 1:
+        return "-1,-1"
+    return value.replace(".", "-1")
+
+
+def iter_genotype_matrices(
+    stream: Iterable[str],
+    keys: Sequence[str] = DEFAULT_KEYS,
+    samples: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[GenotypeMatrix]:
+    """Read a VCF file in a single pass and yield the requested FORMAT
+    values in chunks of at most chunk_size variants. The genotype columns
+    are parsed directly without creating Variant objects. Only the given
+    samples are extracted (all samples by default)."""
+    np = import_numpy()
+
+    all_samples: List[str] = []
+    indices: List[int] = []
+    selected: List[str] = []
+
+    ids: List[str] = []
+
+    # Parsed rows of each key for the current chunk. Rows where a key is
+    # missing are None, and the arrays are only built when a chunk is full,
+    # so memory grows with the rows read rather than with chunk_size.
+    rows: Dict[str, List[Any]] = {key: [] for key in keys}
+
+    # Position of each key in a FORMAT string, cached per FORMAT string
+    key_positions: Dict[str, List[Optional[int]]] = {}
+
+    def chunk() -> GenotypeMatrix:
+        arrays: Dict[str, Any] = {}
+        for key in keys:
+            dtype = np.int8 if key == "GT" else np.int32
+            array = np.full((len(ids), len(selected), 2), -1, dtype=dtype)
+            for row, values in enumerate(rows[key]):
+                if values is not None:
+                    array[row] = values
+            arrays[key] = array
+        return GenotypeMatrix(ids=list(ids), samples=selected, arrays=arrays)
+
+    for line in stream:
+
+        if line.startswith("#"):
+            if line.startswith("#CHROM"):
+                all_samples = line.rstrip("\n").split("\t")[9:]
+                selected = samples if samples is not None else all_samples
+                for sample in selected:
+                    if sample not in all_samples:
+                        raise SampleNotFound(sample)
+                indices = [9 + all_samples.index(sample) for sample in selected]
+            continue
+
+        columns = line.rstrip("\n").split("\t")
+
+        positions = key_positions.get(columns[8])
+        if positions is None:
+            fields = columns[8].split(":")
+            positions = [fields.index(key) if key in fields else None for key in keys]
+            key_positions[columns[8]] = positions
+
+        ids.append(columns[2])
+
+        values = [columns[index].split(":") for index in indices]
+        for key, position in zip(keys, positions):
+            if position is None:
+                rows[key].append(None)
+                continue
+            strings = [
+                sample[position] if position < len(sample) else "." for sample in values
+            ]
+            if key == "GT":
+                text = "/".join(_gt_text(value) for value in strings)
+                parsed = np.fromstring(text, dtype=np.int8, sep="/")
+            else:
+                text = ",".join(_pair_text(value) for value in strings)
+                parsed = np.fromstring(text, dtype=np.int32, sep=",")
+            rows[key].append(
+                parsed.reshape(-1, 2) if len(parsed) == 2 * len(selected) else None
+            )
+
+        if len(ids) == chunk_size:
+            yield chunk()
+            ids.clear()
+            rows = {key: [] for key in keys}
+
+    if ids:
+        yield chunk()
+
+
+def genotype_matrix(
+    stream: Iterable[str],
+    keys: Sequence[str] = DEFAULT_KEYS,
+    samples: Optional[List[str]] = None,
+) -> GenotypeMatrix:
+    """Read all variants of a VCF file into a single GenotypeMatrix."""
+    np = import_numpy()
+
+    chunks = list(iter_genotype_matrices(stream, keys=keys, samples=samples))
+    if not chunks:
+        return GenotypeMatrix(
+            ids=[],
+            samples=samples or [],
+            arrays={
+                key: np.empty(
+                    (0, len(samples or []), 2),
+                    dtype=np.int8 if key == "GT" else np.int32,
+                )
+                for key in keys
+            },
+        )
+    if len(chunks) == 1:
+        return chunks[0]
+    return GenotypeMatrix(
+        ids=[id for matrix in chunks for id in matrix.ids],
+        samples=chunks[0].samples,
+        arrays={
+            key: np.concatenate([matrix.arrays[key] for matrix in chunks])
+            for key in keys
+        },
+    )
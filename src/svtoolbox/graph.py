@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from svtoolbox.core import Interval, Variant
+from svtoolbox.exceptions import InfoFieldNotFound, MissingMate
+
+
+class UnionFind:
+    """Disjoint sets over the integers 0, 1, ..., size - 1, with union by
+    size and path halving."""
+
+    def __init__(self, size: int = 0) -> None:
+        self.parent: List[int] = list(range(size))
+        self.size: List[int] = [1] * size
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, first: int, second: int) -> int:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return first
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+        return first
+
+
+@dataclass
+class Breakend:
+    """A node in the breakpoint graph. The side is 0 for the start of a
+    variant and 1 for its end."""
+
+    variant: str
+    side: int
+    interval: Interval
+
+
+class BreakpointGraph:
+    """Graph with breakends as nodes. Mate edges join the two breakends of
+    a variant, or a BND and its mate. Proximity edges join breakends whose
+    confidence intervals are within a given distance of each other."""
+
+    def __init__(self, variants: Iterable[Variant], distance: int = 0) -> None:
+        self.distance = distance
+        self.breakends: List[Breakend] = []
+        self.sets = UnionFind()
+
+        # Index of the start breakend of each variant, used for linking mates
+        starts: Dict[str, int] = {}
+        mates: List[Tuple[str, str]] = []
+
+        for variant in variants:
+            start = self._add(Breakend(variant.id, 0, variant.ci_start))
+            starts[variant.id] = start
+            if variant.info_dict.get("SVTYPE") == "BND" and variant.mate is not None:
+                # The end of a Manta BND is the start of its mate record
+                mates.append((variant.id, variant.mate.id))
+                continue
+            try:
+                end = self._add(Breakend(variant.id, 1, variant.ci_end))
+            except (InfoFieldNotFound, MissingMate):
+                continue
+            self.sets.union(start, end)
+
+        for first, second in mates:
+            if second in starts:
+                self.sets.union(starts[first], starts[second])
+
+        self._join_nearby()
+
+    def _add(self, breakend: Breakend) -> int:
+        self.breakends.append(breakend)
+        return self.sets.add()
+
+    def _join_nearby(self) -> None:
+        """Sweep over breakends sorted by position, and join each breakend
+        to the previous cluster if it starts within distance of the right
+        end of the cluster so far."""
+        order = sorted(
+            range(len(self.breakends)),
+            key=lambda node: (
+                self.breakends[node].interval.chrom,
+                self.breakends[node].interval.left,
+            ),
+        )
+        previous = -1
+        chrom = ""
+        reach = 0
+        for node in order:
+            interval = self.breakends[node].interval
+            if (
+                previous >= 0
+                and interval.chrom == chrom
+                and interval.left <= reach + self.distance
+            ):
+                self.sets.union(previous, node)
+                reach = max(reach, interval.right)
+            else:
+                chrom, reach = interval.chrom, interval.right
+            previous = node
+
+    def components(self) -> Dict[str, int]:
+        """Return the component ID of each variant. IDs are numbered from
+        zero in the order in which the components are first seen."""
+        ids: Dict[int, int] = {}
+        components: Dict[str, int] = {}
+        for node, breakend in enumerate(self.breakends):
+            root = self.sets.find(node)
+            components[breakend.variant] = ids.setdefault(root, len(ids))
+        return components
+
+
+def rearrangement_components(
+    variants: Iterable[Variant], distance: int = 0
+) -> Dict[str, int]:
+    """Group variants into connected components of the breakpoint graph,
+    and return the component ID of each variant."""
+    return BreakpointGraph(variants, distance=distance).components()
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+import shutil
+
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from svtoolbox.batch import BatchResult, output_path, run_batch
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class Fingerprint:
+    size: int
+    mtime: float
+    sha256: str
+
+
+@dataclass
+class ManifestEntry:
+    fingerprint: Fingerprint
+    output: str
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as stream:
+        while block := stream.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(path: str, previous: Optional[Fingerprint] = None) -> Fingerprint:
+    """Return the fingerprint of a file. Hashing is skipped if size and
+    modification time are the same as in the previous fingerprint."""
+    stat = os.stat(path)
+    if (
+        previous is not None
+        and previous.size == stat.st_size
+        and previous.mtime == stat.st_mtime
+    ):
+        return previous
+    return Fingerprint(size=stat.st_size, mtime=stat.st_mtime, sha256=file_sha256(path))
+
+
+class Manifest:
+    """Fingerprints of processed input files and the outputs made from
+    them. The settings used to create the outputs are stored as well, since
+    changing them means that every file has to be processed again."""
+
+    def __init__(
+        self,
+        settings: Dict[str, Optional[str]],
+        entries: Optional[Dict[str, ManifestEntry]] = None,
+    ) -> None:
+        self.settings = settings
+        self.entries: Dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, path: str, settings: Dict[str, Optional[str]]) -> "Manifest":
+        """Load the manifest. Start afresh if it does not exist, or if it
+        was created with other settings."""
+        if not os.path.exists(path):
+            return cls(settings)
+        with open(path) as stream:
+            data = json.load(stream)
+        if data.get("version") != MANIFEST_VERSION or data["settings"] != settings:
+            return cls(settings)
+        return cls(
+            settings,
+            {
+                vcf: ManifestEntry(
+                    fingerprint=Fingerprint(**entry["fingerprint"]),
+                    output=entry["output"],
+                )
+                for vcf, entry in data["inputs"].items()
+            },
+        )
+
+    def save(self, path: str) -> None:
+        """Write the manifest atomically, so that an interrupted run never
+        leaves a half-written manifest behind."""
+        data = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "inputs": {vcf: asdict(entry) for vcf, entry in self.entries.items()},
+        }
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as stream:
+            json.dump(data, stream, indent=2)
+        os.replace(temporary, path)
+
+    def is_current(self, vcf: str, output: str) -> Tuple[bool, Fingerprint]:
+        """Check whether an input is unchanged since its output was made."""
+        entry = self.entries.get(vcf)
+        current = fingerprint(vcf, entry.fingerprint if entry else None)
+        if entry is None or entry.output != output or not os.path.exists(output):
+            return False, current
+        return entry.fingerprint.sha256 == current.sha256, current
+
+
+def run_incremental(
+    vcfs: List[str],
+    manifest_path: str,
+    template: str,
+    output_format: str = "bedpe",
+    include_fields: Optional[List[str]] = None,
+    jobs: int = 1,
+) -> Iterator[Tuple[BatchResult, bool]]:
+    """Like run_batch, but inputs whose fingerprints match the manifest are
+    skipped. Yields (result, skipped) pairs. Inputs that are no longer
+    present are dropped from the manifest, and failed inputs are left out
+    so they are retried next time."""
+    manifest = Manifest.load(
+        manifest_path,
+        settings={
+            "template": template,
+            "format": output_format,
+            "include_fields": ",".join(include_fields) if include_fields else None,
+        },
+    )
+
+    fingerprints: Dict[str, Fingerprint] = {}
+    stale: List[str] = []
+    for vcf in vcfs:
+        output = output_path(vcf, template, output_format)
+        current, fingerprints[vcf] = manifest.is_current(vcf, output)
+        if current:
+            yield BatchResult(vcf=vcf, output=output, variants=0, seconds=0.0), True
+        else:
+            stale.append(vcf)
+
+    # Stale inputs are dropped until they have been converted again, so an
+    # interrupted run never records an input as up to date too early
+    manifest.entries = {
+        vcf: entry
+        for vcf, entry in manifest.entries.items()
+        if vcf in fingerprints and vcf not in stale
+    }
+    for vcf, entry in manifest.entries.items():
+        entry.fingerprint = fingerprints[vcf]
+
+    try:
+        for result in run_batch(
+            stale,
+            template=template,
+            output_format=output_format,
+            include_fields=include_fields,
+            jobs=jobs,
+        ):
+            if result.ok:
+                manifest.entries[result.vcf] = ManifestEntry(
+                    fingerprint=fingerprints[result.vcf], output=result.output
+                )
+            yield result, False
+    finally:
+        manifest.save(manifest_path)
+
+
+def merge_outputs(outputs: List[str], combined: str) -> None:
+    """Concatenate per-file BEDPE outputs into one file. This gives the
+    same result as converting all inputs again, without parsing anything."""
+    temporary = f"{combined}.tmp"
+    with open(temporary, "wb") as out:
+        for output in outputs:
+            with open(output, "rb") as stream:
+                shutil.copyfileobj(stream, out)
+    os.replace(temporary, combined)
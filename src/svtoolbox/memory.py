@@ -0,0 +1,62 @@
+import resource
+import sys
+
+from dataclasses import dataclass
+from typing import Optional
+
+# Rough size of a parsed Variant with its INFO dictionary, used to turn a
+# number of bytes into a number of variants or rows
+VARIANT_SIZE_ESTIMATE = 4096
+
+# Smallest sizes handed out, so that tiny budgets still make progress
+MIN_SORT_BUFFER = 1 << 20
+MIN_PENDING = 64
+MIN_BATCH_SIZE = 256
+
+
+@dataclass
+class MemoryBudget:
+    """Split a memory limit between the parts of a run that grow with the
+    input. Half goes to the sort buffer, a quarter to BND variants waiting
+    for their mate, and an eighth to output batches. The rest is left for
+    the interpreter and everything else. Without a limit, nothing is
+    bounded and every size is None."""
+
+    total: Optional[int] = None
+
+    def _share(self, fraction: float, minimum: int, unit: int = 1) -> Optional[int]:
+        if self.total is None:
+            return None
+        return max(int(self.total * fraction) // unit, minimum)
+
+    @property
+    def sort_buffer(self) -> Optional[int]:
+        """Bytes used for sorting before spilling runs to disk."""
+        return self._share(1 / 2, MIN_SORT_BUFFER)
+
+    @property
+    def max_pending(self) -> Optional[int]:
+        """Number of BND variants kept in memory while waiting for mates."""
+        return self._share(1 / 4, MIN_PENDING, VARIANT_SIZE_ESTIMATE)
+
+    @property
+    def batch_size(self) -> Optional[int]:
+        """Number of rows in each output batch."""
+        return self._share(1 / 8, MIN_BATCH_SIZE, VARIANT_SIZE_ESTIMATE)
+
+
+def peak_rss() -> int:
+    """Return the peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_size(size: int) -> str:
+    """Format a number of bytes with the units accepted by --max_memory."""
+    value = float(size)
+    for unit in ("B", "K", "M", "G"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}T"
@@ -1,28 +1,104 @@
-from typing import Dict, Iterable, List
+import os
 
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from svtoolbox.callers import detect_caller
+from svtoolbox.contigs import ContigDictionary
 from svtoolbox.core import Variant
-from svtoolbox.exceptions import InfoFieldNotFound
+from svtoolbox.exceptions import (
+    InfoFieldNotFound,
+    PositionOutOfRange,
+    SampleNotFound,
+)
 
+if TYPE_CHECKING:
+    # Only needed when pending mates are spilled to disk
+    import shelve
+    import tempfile
 
-def parse_vcf(stream: Iterable) -> Dict[str, Variant]:
-    """Read VCF file line by line and return a dictionary of with
-    variant IDs as keys and Variant objects as values."""
 
-    variants: Dict[str, Variant] = {}
-    samples: List[str] = []
+class VcfReader:
+    """Read a VCF file one variant at a time. The header is read when the
+    reader is created, so that header lines and sample names are known
+    before the first variant is read.
+
+    If a list of samples is given, only the genotype columns of those
+    samples are stored in the variants. Each line is then only split as
+    far as the last selected column, so unselected samples cost nothing.
+
+    Contigs declared in the header are collected in a ContigDictionary, and
+    chromosome names of variants are interned through it. With validate,
+    positions beyond the end of their contig raise an exception.
+
+    The variant caller is detected from the header, and variants are given
+    the matching decoder for END, mate and confidence interval rules."""
+
+    def __init__(
+        self,
+        stream: Iterable[str],
+        samples: Optional[List[str]] = None,
+        validate: bool = False,
+    ) -> None:
+        self._lines = iter(stream)
+        self._first_line: Optional[str] = None
+
+        self.header: List[str] = []
+        self.samples: List[str] = []
 
-    for line in stream:
+        # Column indices of the selected samples, if any are selected
+        self._indices: Optional[List[int]] = None
+        self._max_split = -1
 
-        # Skip header lines
-        if line.startswith("#"):
+        for line in self._lines:
+            if not line.startswith("#"):
+                self._first_line = line
+                break
+            self.header.append(line.rstrip("\n"))
             if line.startswith("#CHROM"):
-                samples = line.rstrip("\n").split("\t")[9:]
-            continue
+                self.samples = line.rstrip("\n").split("\t")[9:]
+                break
 
-        columns = line.rstrip("\n").split("\t")
+        if samples is not None:
+            for sample in samples:
+                if sample not in self.samples:
+                    raise SampleNotFound(sample)
+            self._indices = [9 + self.samples.index(sample) for sample in samples]
+            self._max_split = max(self._indices, default=8) + 1
+            self.samples = list(samples)
 
-        variant = Variant(
-            chrom=columns[0],
+        self.contigs = ContigDictionary.from_header(self.header)
+        self.validate = validate
+        self.decoder = detect_caller(self.header)
+
+    def records(self) -> Iterator[Tuple[str, Variant]]:
+        """Yield each data line together with the Variant parsed from it."""
+        if self._first_line is not None:
+            line, self._first_line = self._first_line, None
+            yield line, self.parse_line(line)
+        for line in self._lines:
+            # Skip header lines
+            if line.startswith("#"):
+                continue
+            yield line, self.parse_line(line)
+
+    def __iter__(self) -> Iterator[Variant]:
+        for _, variant in self.records():
+            yield variant
+
+    def parse_line(self, line: str) -> Variant:
+        columns = line.rstrip("\n").split("\t", self._max_split)
+        if self._indices is None:
+            genotypes = dict(zip(self.samples, columns[9:]))
+        else:
+            genotypes = {
+                sample: columns[index]
+                for sample, index in zip(self.samples, self._indices)
+            }
+        chrom = self.contigs.intern(columns[0])
+        if self.validate and not self.contigs.contains_position(chrom, int(columns[1])):
+            raise PositionOutOfRange(f"{chrom}:{columns[1]}")
+        return Variant(
+            chrom=chrom,
             pos=columns[1],
             id=columns[2],
             ref=columns[3],
@@ -31,9 +107,28 @@ def parse_vcf(stream: Iterable) -> Dict[str, Variant]:
             filter=columns[6],
             info=columns[7],
             format=columns[8],
-            genotypes=dict(zip(samples, columns[9:])),
+            genotypes=genotypes,
+            decoder=self.decoder,
         )
 
+
+def parse_vcf(
+    stream: Iterable, samples: Optional[List[str]] = None
+) -> Dict[str, Variant]:
+    """Read VCF file line by line and return a dictionary of with
+    variant IDs as keys and Variant objects as values. If samples are
+    given, only their genotypes are kept."""
+    return link_mates(VcfReader(stream, samples=samples))
+
+
+def link_mates(records: Iterable[Variant]) -> Dict[str, Variant]:
+    """Return a dictionary with variant IDs as keys and Variant objects as
+    values, where BND variants are linked to their mates."""
+
+    variants: Dict[str, Variant] = {}
+
+    for variant in records:
+
         variants[variant.id] = variant
 
         # If the variant is a BND, and if we have already encountered
@@ -48,3 +143,81 @@ def parse_vcf(stream: Iterable) -> Dict[str, Variant]:
                 pass
 
     return variants
+
+
+class MateResolver:
+    """Link BND mates in a stream of variants without keeping the whole
+    file in memory. Variants are handed back as soon as they can be
+    converted: most variants right away, and BND variants once their mate
+    has been seen. Only BND variants waiting for their mate are kept.
+
+    If max_pending is given, the waiting variants are moved to a shelf in
+    a temporary directory whenever more than max_pending of them are held
+    in memory, so memory use stays bounded for files with many mates far
+    apart. Spilled variants are read back when their mate turns up."""
+
+    def __init__(
+        self, max_pending: Optional[int] = None, temp_dir: Optional[str] = None
+    ) -> None:
+        self.pending: Dict[str, Variant] = {}
+        self.max_pending = max_pending
+        self.temp_dir = temp_dir
+        self.spilled = 0
+        self._directory: Optional["tempfile.TemporaryDirectory"] = None
+        self._shelf: Optional["shelve.Shelf"] = None
+
+    def add(self, variant: Variant) -> List[Variant]:
+        if variant.info_dict.get("SVTYPE") != "BND":
+            return [variant]
+        mate_id = variant.info_dict.get("MATEID")
+        if not isinstance(mate_id, str):
+            return [variant]
+        mate = self.pending.pop(mate_id, None)
+        if mate is None and self._shelf is not None and mate_id in self._shelf:
+            mate = self._shelf.pop(mate_id)
+        if mate is None:
+            self.pending[variant.id] = variant
+            if self.max_pending is not None and len(self.pending) > self.max_pending:
+                self._spill()
+            return []
+        variant.mate = mate
+        mate.mate = variant
+        return [mate, variant]
+
+    def _spill(self) -> None:
+        import shelve
+        import tempfile
+
+        if self._shelf is None:
+            self._directory = tempfile.TemporaryDirectory(
+                prefix="svtoolbox-mates-", dir=self.temp_dir
+            )
+            self._shelf = shelve.open(os.path.join(self._directory.name, "pending"))
+        self._shelf.update(self.pending)
+        self.spilled += len(self.pending)
+        self.pending.clear()
+
+    def finish(self) -> List[Variant]:
+        """Return the variants whose mate was never seen."""
+        orphans = list(self.pending.values())
+        self.pending.clear()
+        if self._shelf is not None:
+            orphans.extend(self._shelf.values())
+            self._shelf.close()
+            self._shelf = None
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+        return orphans
+
+
+def resolve_mates(
+    variants: Iterable[Variant], max_pending: Optional[int] = None
+) -> Iterator[Variant]:
+    """Yield variants with BND mates linked. BND variants are delayed until
+    their mate has been read, so the order can differ from the input. With
+    max_pending, waiting variants beyond that number are spilled to disk."""
+    resolver = MateResolver(max_pending=max_pending)
+    for variant in variants:
+        yield from resolver.add(variant)
+    yield from resolver.finish()
@@ -0,0 +1,158 @@
+import heapq
+import os
+import struct
+
+from typing import TYPE_CHECKING, BinaryIO, Iterable, Iterator, List, Optional, Tuple
+
+from svtoolbox.contigs import ContigDictionary
+from svtoolbox.core import BedPE
+
+if TYPE_CHECKING:
+    # Only needed once the buffer is spilled to disk
+    import tempfile
+
+DEFAULT_BUFFER_SIZE = 256 * 1024 * 1024
+
+# Maximum number of runs merged at once. If there are more runs than this,
+# they are merged in several rounds to keep the number of open files down.
+MAX_FAN_IN = 128
+
+# Rough per-record overhead of Python objects, added to the size of the
+# key and line when estimating how much memory the buffer uses
+RECORD_OVERHEAD = 150
+
+# Offset making negative coordinates sort correctly as unsigned integers
+COORDINATE_OFFSET = 1 << 63
+
+Record = Tuple[bytes, bytes]
+
+
+def bedpe_sort_key(bedpe: BedPE, contigs: Optional[ContigDictionary] = None) -> bytes:
+    """Pack (chrom_1, start_1, chrom_2, start_2) into bytes which sort in
+    the same order as the tuple. Coordinates are stored as big-endian
+    unsigned integers. Without a contig dictionary, chromosome names are
+    stored terminated by a null byte, so they sort lexicographically. With
+    one, the integer contig IDs are stored instead, so chromosomes sort in
+    the order of the VCF header."""
+    if contigs is not None:
+        return struct.pack(
+            ">IQIQ",
+            contigs.id(bedpe.chrom_1),
+            bedpe.start_1 + COORDINATE_OFFSET,
+            contigs.id(bedpe.chrom_2),
+            bedpe.start_2 + COORDINATE_OFFSET,
+        )
+    return b"".join(
+        [
+            bedpe.chrom_1.encode(),
+            b"\0",
+            struct.pack(">Q", bedpe.start_1 + COORDINATE_OFFSET),
+            bedpe.chrom_2.encode(),
+            b"\0",
+            struct.pack(">Q", bedpe.start_2 + COORDINATE_OFFSET),
+        ]
+    )
+
+
+def _write_run(records: Iterable[Record], stream: BinaryIO) -> None:
+    for key, line in records:
+        stream.write(struct.pack(">HI", len(key), len(line)))
+        stream.write(key)
+        stream.write(line)
+
+
+def _read_run(path: str) -> Iterator[Record]:
+    with open(path, "rb", buffering=1 << 20) as stream:
+        while header := stream.read(6):
+            key_length, line_length = struct.unpack(">HI", header)
+            yield stream.read(key_length), stream.read(line_length)
+
+
+class ExternalSorter:
+    """Sort lines by binary keys within a fixed memory budget. Records are
+    gathered in memory until the buffer is full. The buffer is then sorted
+    and spilled to a temporary file as a sorted run. Iterating over the
+    sorter k-way merges the runs. If everything fits in the buffer, nothing
+    is written to disk."""
+
+    def __init__(
+        self, buffer_size: int = DEFAULT_BUFFER_SIZE, temp_dir: Optional[str] = None
+    ) -> None:
+        self.buffer_size = buffer_size
+        self.temp_dir = temp_dir
+        self._buffer: List[Record] = []
+        self._buffered_bytes = 0
+        self._directory: Optional["tempfile.TemporaryDirectory"] = None
+        self._runs: List[str] = []
+        self._run_count = 0
+
+    def add(self, key: bytes, line: str) -> None:
+        encoded = line.encode()
+        self._buffer.append((key, encoded))
+        self._buffered_bytes += len(key) + len(encoded) + RECORD_OVERHEAD
+        if self._buffered_bytes >= self.buffer_size:
+            self._spill()
+
+    def _new_run_path(self) -> str:
+        if self._directory is None:
+            import tempfile
+
+            self._directory = tempfile.TemporaryDirectory(
+                prefix="svtoolbox-sort-", dir=self.temp_dir
+            )
+        self._run_count += 1
+        return os.path.join(self._directory.name, f"run_{self._run_count}")
+
+    def _spill(self) -> None:
+        self._buffer.sort()
+        path = self._new_run_path()
+        with open(path, "wb", buffering=1 << 20) as stream:
+            _write_run(self._buffer, stream)
+        self._runs.append(path)
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def _merge_runs(self) -> None:
+        """Merge runs in rounds until at most MAX_FAN_IN runs are left."""
+        while len(self._runs) > MAX_FAN_IN:
+            batch, self._runs = self._runs[:MAX_FAN_IN], self._runs[MAX_FAN_IN:]
+            path = self._new_run_path()
+            with open(path, "wb", buffering=1 << 20) as stream:
+                _write_run(heapq.merge(*[_read_run(run) for run in batch]), stream)
+            for run in batch:
+                os.remove(run)
+            self._runs.append(path)
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            if not self._runs:
+                self._buffer.sort()
+                records: Iterable[Record] = self._buffer
+            else:
+                if self._buffer:
+                    self._spill()
+                self._merge_runs()
+                records = heapq.merge(*[_read_run(run) for run in self._runs])
+            for _, line in records:
+                yield line.decode()
+        finally:
+            self._buffer = []
+            self._runs = []
+            if self._directory is not None:
+                self._directory.cleanup()
+                self._directory = None
+
+
+def sort_bedpe(
+    bedpes: Iterable[BedPE],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    temp_dir: Optional[str] = None,
+    contigs: Optional[ContigDictionary] = None,
+) -> Iterator[str]:
+    """Yield BEDPE lines sorted by (chrom_1, start_1, chrom_2, start_2),
+    using at most roughly buffer_size bytes of memory. Chromosomes are
+    sorted by name, or in contig order if a contig dictionary is given."""
+    sorter = ExternalSorter(buffer_size=buffer_size, temp_dir=temp_dir)
+    for bedpe in bedpes:
+        sorter.add(bedpe_sort_key(bedpe, contigs), str(bedpe))
+    return iter(sorter)
@@ -0,0 +1,182 @@
+import math
+
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from svtoolbox.core import Variant
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Resolution of the length and CI width histograms. Bins are about 4.4%
+# wide, so quantiles are within about 2.2% of the true value, and a few
+# hundred bins still cover every length up to a whole chromosome.
+BINS_PER_OCTAVE = 16
+
+
+class LogHistogram:
+    """Histogram with logarithmic bins, which doubles as an approximate
+    quantile sketch. Each octave [2^k, 2^(k+1)) is split into the given
+    number of bins, so quantiles are accurate to within a relative error
+    of about 2^(1/bins_per_octave) - 1. Memory only depends on the range
+    of the values, not on how many there are. Zeros get their own bin."""
+
+    def __init__(self, bins_per_octave: int = 1) -> None:
+        self.bins_per_octave = bins_per_octave
+        self.counts: Counter = Counter()
+        self.zeros = 0
+        self.total = 0
+
+    def add(self, value: float) -> None:
+        value = abs(value)
+        self.total += 1
+        if value < 1:
+            self.zeros += 1
+        else:
+            self.counts[math.floor(math.log2(value) * self.bins_per_octave)] += 1
+
+    def bounds(self, index: int) -> List[float]:
+        return [
+            2 ** (index / self.bins_per_octave),
+            2 ** ((index + 1) / self.bins_per_octave),
+        ]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Return the approximate q-quantile, or None if there are no values."""
+        if self.total == 0:
+            return None
+        rank = q * (self.total - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if rank < seen:
+                # The geometric midpoint of the bin
+                lower, upper = self.bounds(index)
+                return round(math.sqrt(lower * upper), 1)
+        lower, upper = self.bounds(max(self.counts))
+        return round(math.sqrt(lower * upper), 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        histogram = [{"min": 0, "max": 1, "count": self.zeros}] if self.zeros else []
+        for index in sorted(self.counts):
+            lower, upper = self.bounds(index)
+            histogram.append(
+                {"min": round(lower), "max": round(upper), "count": self.counts[index]}
+            )
+        return {
+            "count": self.total,
+            "histogram": histogram,
+            "quantiles": {str(q): self.quantile(q) for q in QUANTILES},
+        }
+
+
+def _interval_width(value: Any) -> Optional[int]:
+    try:
+        left, right = str(value).split(",")
+        return int(right) - int(left)
+    except ValueError:
+        return None
+
+
+def _length(variant: Variant, svtype: str) -> Optional[int]:
+    """Return the length from SVLEN, or from END if SVLEN is missing. Values
+    that do not parse, such as the missing value ".", are skipped."""
+    info = variant.info_dict
+    try:
+        return int(str(info["SVLEN"]).split(",")[0])
+    except (KeyError, ValueError):
+        pass
+    if svtype == "INS":
+        return None
+    try:
+        return int(str(info["END"])) - int(variant.pos)
+    except (KeyError, ValueError):
+        return None
+
+
+class VariantStats:
+    """Summary statistics aggregated in a single pass over the variants.
+    Apart from the histograms, the only state kept is the set of BND mates
+    that have been referenced but not seen yet."""
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.svtypes: Counter = Counter()
+        self.filters: Counter = Counter()
+        self.svlen = LogHistogram(BINS_PER_OCTAVE)
+        self.ci_widths = {
+            "CIPOS": LogHistogram(BINS_PER_OCTAVE),
+            "CIEND": LogHistogram(BINS_PER_OCTAVE),
+        }
+        self.intrachromosomal = 0
+        self.interchromosomal = 0
+        self._waiting_for: Set[str] = set()
+
+    def add(self, variant: Variant) -> None:
+        info = variant.info_dict
+        svtype = str(info.get("SVTYPE", "."))
+
+        self.records += 1
+        self.svtypes[svtype] += 1
+        for name in variant.filter.split(";"):
+            self.filters[name] += 1
+
+        for key, histogram in self.ci_widths.items():
+            if key in info:
+                width = _interval_width(info[key])
+                if width is not None:
+                    histogram.add(width)
+
+        if svtype == "BND":
+            self._add_breakend(variant)
+        else:
+            length = _length(variant, svtype)
+            if length is not None:
+                self.svlen.add(length)
+
+    def _add_breakend(self, variant: Variant) -> None:
+        info = variant.info_dict
+        if "CHR2" in info:
+            mate_chrom: Optional[str] = str(info["CHR2"])
+        else:
+            mate = variant.alt_mate
+            mate_chrom = mate.chrom if mate is not None else None
+        if mate_chrom == variant.chrom:
+            self.intrachromosomal += 1
+        elif mate_chrom is not None:
+            self.interchromosomal += 1
+
+        if "MATEID" in info:
+            if variant.id in self._waiting_for:
+                self._waiting_for.remove(variant.id)
+            else:
+                self._waiting_for.add(str(info["MATEID"]))
+
+    @property
+    def orphan_mates(self) -> int:
+        """BND records whose mate has not been seen (so far)."""
+        return len(self._waiting_for)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "records": self.records,
+            "svtype": dict(self.svtypes.most_common()),
+            "filter": dict(self.filters.most_common()),
+            "svlen": self.svlen.to_dict(),
+            "bnd": {
+                "intrachromosomal": self.intrachromosomal,
+                "interchromosomal": self.interchromosomal,
+                "orphan_mates": self.orphan_mates,
+            },
+            "ci_width": {
+                key: histogram.to_dict() for key, histogram in self.ci_widths.items()
+            },
+        }
+
+
+def variant_stats(variants: Iterable[Variant]) -> VariantStats:
+    stats = VariantStats()
+    for variant in variants:
+        stats.add(variant)
+    return stats
@@ -1,11 +1,13 @@
-from typing import List
-
-from pysam import AlignedSegment
+from typing import TYPE_CHECKING, List
 
 from svtoolbox.core import Variant
 
+# Importing pysam is slow, and it is only needed for type checking here
+if TYPE_CHECKING:
+    from pysam import AlignedSegment
+
 
-def check_contig_support(variant: Variant, alignments: List[AlignedSegment]) -> bool:
+def check_contig_support(variant: Variant, alignments: List["AlignedSegment"]) -> bool:
     """Check if the variant is supported by alignment of contigs. This
     is very much work in progress and should not yet be used in production!"""
     return len(alignments) > 0
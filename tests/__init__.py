@@ -0,0 +1,16 @@
+HEADER = "\t".join(
+    ["#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT", "SAMPLE"]
+)
+
+
+def record(
+    chrom: str,
+    pos: int,
+    id: str,
+    alt: str,
+    info: str,
+    qual: str = ".",
+    filter: str = "PASS",
+) -> str:
+    """Return a VCF line with one sample, to follow HEADER."""
+    return "\t".join([chrom, str(pos), id, "N", alt, qual, filter, info, "GT", "0/1"])
@@ -0,0 +1,73 @@
+import asyncio
+import gzip
+import os
+import tempfile
+import unittest
+
+from svtoolbox.aio import aiter_vcf, write_bedpe
+from tests import HEADER, record
+
+
+class TestAsyncPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.vcf = os.path.join(self.directory.name, "sample.vcf.gz")
+        self.output = os.path.join(self.directory.name, "sample.bedpe")
+
+        lines = [
+            HEADER,
+            record("chr1", 100, "BND:0", "N[chr2:500[", "SVTYPE=BND;MATEID=BND:1"),
+        ]
+        lines += [
+            record("chr1", 1000 + i, f"DEL{i}", "<DEL>", f"SVTYPE=DEL;END={2000 + i}")
+            for i in range(25)
+        ]
+        lines += [
+            record("chr2", 500, "BND:1", "]chr1:100]N", "SVTYPE=BND;MATEID=BND:0")
+        ]
+        with gzip.open(self.vcf, "wt") as stream:
+            stream.write("\n".join(lines) + "\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_aiter_vcf(self) -> None:
+        async def collect() -> list:
+            return [len(batch) async for batch in aiter_vcf(self.vcf, batch_size=10)]
+
+        self.assertEqual(asyncio.run(collect()), [10, 10, 7])
+
+    def test_write_bedpe(self) -> None:
+        lines = asyncio.run(write_bedpe(self.vcf, self.output, batch_size=4))
+        self.assertEqual(lines, 27)
+        with open(self.output) as stream:
+            bedpe = stream.read().splitlines()
+        self.assertEqual(bedpe[0], "chr1\t999\t1000\tchr1\t1999\t2000\tDEL0\t.\t.\t.")
+        # BND records are written once the mate has been read
+        self.assertEqual(bedpe[-2], "chr1\t99\t100\tchr2\t499\t500\tBND:0\t.\t.\t.")
+        self.assertEqual(bedpe[-1], "chr2\t499\t500\tchr1\t99\t100\tBND:1\t.\t.\t.")
+
+    def test_cancellation(self) -> None:
+        async def consume_slowly() -> None:
+            async for _ in aiter_vcf(self.vcf, batch_size=1, queue_size=1):
+                await asyncio.sleep(1)
+
+        async def cancel() -> bool:
+            task = asyncio.create_task(consume_slowly())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        self.assertTrue(asyncio.run(cancel()))
+
+    def test_errors_are_raised_and_output_removed(self) -> None:
+        with gzip.open(self.vcf, "at") as stream:
+            stream.write("chr1\t100\n")
+        with self.assertRaises(IndexError):
+            asyncio.run(write_bedpe(self.vcf, self.output))
+        self.assertFalse(os.path.exists(self.output))
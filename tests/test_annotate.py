@@ -0,0 +1,132 @@
+import io
+import unittest
+
+from svtoolbox.annotate import (
+    Annotator,
+    BedOverlapAnnotator,
+    ConfidenceIntervalAnnotator,
+    MateEndAnnotator,
+    SvLenAnnotator,
+    annotate_vcf,
+)
+from svtoolbox.bed import BedIndex, BedRegion
+
+
+class TestAnnotateVcf(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.vcf_lines = [
+            "##fileformat=VCFv4.1",
+            '##INFO=<ID=SVLEN,Number=.,Type=Integer,Description="Difference in length between REF and ALT alleles">',
+            "\t".join(
+                [
+                    "#CHROM",
+                    "POS",
+                    "ID",
+                    "REF",
+                    "ALT",
+                    "QUAL",
+                    "FILTER",
+                    "INFO",
+                    "FORMAT",
+                    "SAMPLE",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr1",
+                    "100",
+                    "MantaDEL",
+                    "A",
+                    "<DEL>",
+                    ".",
+                    "PASS",
+                    "END=200;SVTYPE=DEL;CIPOS=-10,5",
+                    "GT",
+                    "0/1",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr2",
+                    "200",
+                    "MantaBND:0",
+                    "A",
+                    "[chr4:400[A",
+                    ".",
+                    "PASS",
+                    "SVTYPE=BND;MATEID=MantaBND:1",
+                    "GT",
+                    "0/1",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr3",
+                    "300",
+                    "MantaINV",
+                    "G",
+                    "<INV>",
+                    ".",
+                    "PASS",
+                    "END=400;SVTYPE=INV",
+                    "GT",
+                    "0/1",
+                ]
+            ),
+        ]
+
+    def annotate(self, annotators: list) -> list:
+        out = io.StringIO()
+        annotate_vcf(self.vcf_lines, out, annotators)
+        return out.getvalue().splitlines()
+
+    def test_header_lines_are_injected_once(self) -> None:
+        lines = self.annotate([SvLenAnnotator(), MateEndAnnotator()])
+        header = [line for line in lines if line.startswith("#")]
+        self.assertEqual(len(header), 5)
+        self.assertEqual(header[1], self.vcf_lines[1])
+        self.assertTrue(header[2].startswith("##INFO=<ID=CHR2,"))
+        self.assertTrue(header[3].startswith("##INFO=<ID=POS2,"))
+        self.assertTrue(header[4].startswith("#CHROM"))
+
+    def test_annotations(self) -> None:
+        index = BedIndex([BedRegion(chrom="chr4", start=350, end=450, name="hit")])
+        lines = self.annotate(
+            [
+                MateEndAnnotator(),
+                SvLenAnnotator(),
+                ConfidenceIntervalAnnotator(),
+                BedOverlapAnnotator(index),
+            ]
+        )
+        self.assertEqual(
+            lines[-3].split("\t")[7],
+            "END=200;SVTYPE=DEL;CIPOS=-10,5;SVLEN=-100;BEDPE_CI1=89,105;BEDPE_CI2=199,200",
+        )
+        self.assertEqual(
+            lines[-2].split("\t")[7],
+            "SVTYPE=BND;MATEID=MantaBND:1;CHR2=chr4;POS2=400;BEDPE_CI1=199,200;BEDPE_CI2=399,400;BED_OVERLAP=hit",
+        )
+
+    def test_unmodified_records_are_passed_through(self) -> None:
+        lines = self.annotate([SvLenAnnotator()])
+        self.assertEqual(lines[-2], self.vcf_lines[-2])
+
+    def test_existing_fields_are_replaced(self) -> None:
+        self.vcf_lines[-1] = self.vcf_lines[-1].replace(
+            "SVTYPE=INV", "SVTYPE=INV;BEDPE_CI1=0,1"
+        )
+        lines = self.annotate([ConfidenceIntervalAnnotator()])
+        self.assertEqual(
+            lines[-1].split("\t")[7],
+            "END=400;SVTYPE=INV;BEDPE_CI1=299,300;BEDPE_CI2=399,400",
+        )
+
+    def test_annotate_must_be_implemented(self) -> None:
+        class NoAnnotate(Annotator):
+            header_lines = []
+
+        with self.assertRaises(TypeError):
+            NoAnnotate()  # type: ignore[abstract]
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+
+from svtoolbox.arrow import (
+    info_types,
+    iter_record_batches,
+    to_arrow_table,
+    write_arrow,
+)
+from svtoolbox.parser import parse_vcf
+
+try:
+    import pyarrow  # type: ignore
+except ImportError:
+    pyarrow = None
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestArrowExport(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.vcf_lines = vcf_lines = [
+            "##fileformat=VCFv4.1",
+            '##INFO=<ID=END,Number=1,Type=Integer,Description="End position">',
+            '##INFO=<ID=CIPOS,Number=2,Type=Integer,Description="Confidence interval">',
+            '##INFO=<ID=IMPRECISE,Number=0,Type=Flag,Description="Imprecise">',
+            "\t".join(
+                [
+                    "#CHROM",
+                    "POS",
+                    "ID",
+                    "REF",
+                    "ALT",
+                    "QUAL",
+                    "FILTER",
+                    "INFO",
+                    "FORMAT",
+                    "NORMAL",
+                    "TUMOR",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr1",
+                    "100",
+                    "MantaDEL",
+                    "A",
+                    "<DEL>",
+                    "999",
+                    "PASS",
+                    "END=200;SVTYPE=DEL;CIPOS=-10,5;IMPRECISE",
+                    "PR:SR",
+                    "15,0:30,0",
+                    "30,5:60,20",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr2",
+                    "200",
+                    "MantaBND:0",
+                    "A",
+                    "[chr4:400[A",
+                    ".",
+                    "PASS",
+                    "SVTYPE=BND;MATEID=MantaBND:1",
+                    "PR",
+                    "25,0",
+                    "20,10",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr4",
+                    "400",
+                    "MantaBND:1",
+                    "G",
+                    "[chr2:200[G",
+                    ".",
+                    "MinQUAL",
+                    "SVTYPE=BND;MATEID=MantaBND:0",
+                    "PR",
+                    "25,0",
+                    "20,10",
+                ]
+            ),
+        ]
+
+        self.variants = parse_vcf(vcf_lines)
+
+    def test_to_arrow_table(self) -> None:
+        table = to_arrow_table(
+            self.variants.values(),
+            info_keys=["CIPOS", "IMPRECISE"],
+            format_keys=["SR"],
+        )
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(
+            table.column_names,
+            [
+                "chrom_1",
+                "start_1",
+                "end_1",
+                "chrom_2",
+                "start_2",
+                "end_2",
+                "name",
+                "qual",
+                "filter",
+                "svtype",
+                "INFO_CIPOS",
+                "INFO_IMPRECISE",
+                "NORMAL_SR",
+                "TUMOR_SR",
+            ],
+        )
+        self.assertEqual(
+            table.to_pylist()[0],
+            {
+                "chrom_1": "chr1",
+                "start_1": 89,
+                "end_1": 105,
+                "chrom_2": "chr1",
+                "start_2": 199,
+                "end_2": 200,
+                "name": "MantaDEL",
+                "qual": 999.0,
+                "filter": "PASS",
+                "svtype": "DEL",
+                "INFO_CIPOS": "-10,5",
+                "INFO_IMPRECISE": "true",
+                "NORMAL_SR": "30,0",
+                "TUMOR_SR": "60,20",
+            },
+        )
+        self.assertIsNone(table.column("qual")[1].as_py())
+        self.assertIsNone(table.column("TUMOR_SR")[1].as_py())
+        self.assertEqual(table.column("chrom_2")[1].as_py(), "chr4")
+
+    def test_typed_info_columns(self) -> None:
+        types = info_types(self.vcf_lines)
+        self.assertEqual(
+            types, {"END": "int64", "CIPOS": "string", "IMPRECISE": "bool"}
+        )
+        table = to_arrow_table(
+            self.variants.values(),
+            info_keys=["END", "CIPOS", "IMPRECISE", "SVTYPE"],
+            types=types,
+        )
+        self.assertEqual(
+            [str(table.schema.field(f"INFO_{key}").type) for key in types],
+            ["int64", "string", "bool"],
+        )
+        self.assertEqual(table.column("INFO_END").to_pylist(), [200, None, None])
+        self.assertEqual(
+            table.column("INFO_IMPRECISE").to_pylist(), [True, False, False]
+        )
+        self.assertEqual(table.column("INFO_CIPOS")[0].as_py(), "-10,5")
+        self.assertEqual(table.column("INFO_SVTYPE")[0].as_py(), "DEL")
+
+    def test_record_batches_are_bounded(self) -> None:
+        batches = list(iter_record_batches(self.variants.values(), batch_size=2))
+        self.assertEqual([batch.num_rows for batch in batches], [2, 1])
+
+    def test_write_parquet_and_arrow(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            parquet_path = os.path.join(directory, "variants.parquet")
+            write_arrow(self.variants.values(), parquet_path, file_format="parquet")
+            import pyarrow.parquet  # type: ignore
+
+            self.assertEqual(pyarrow.parquet.read_table(parquet_path).num_rows, 3)
+
+            arrow_path = os.path.join(directory, "variants.arrow")
+            write_arrow(self.variants.values(), arrow_path, file_format="arrow")
+            with pyarrow.ipc.open_file(arrow_path) as reader:
+                self.assertEqual(reader.read_all().num_rows, 3)
@@ -0,0 +1,110 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from unittest import mock
+
+from svtoolbox.batch import (
+    BatchResult,
+    expand_inputs,
+    output_path,
+    process_vcf,
+    run_batch,
+    vcf_stem,
+)
+
+VCF_LINES = [
+    "##fileformat=VCFv4.1",
+    "\t".join(
+        ["#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT", "S"]
+    ),
+    "\t".join(
+        [
+            "chr1",
+            "100",
+            "MantaDEL",
+            "A",
+            "<DEL>",
+            ".",
+            "PASS",
+            "END=200;SVTYPE=DEL",
+            "GT",
+            "0/1",
+        ]
+    ),
+]
+
+
+def crash_on_bad(vcf: str, output: str, *args) -> BatchResult:
+    """Kill the worker process on bad.vcf.gz, as running out of memory would."""
+    if os.path.basename(vcf) == "bad.vcf.gz":
+        os._exit(1)
+    return process_vcf(vcf, output, *args)
+
+
+class TestOutputPaths(unittest.TestCase):
+
+    def test_vcf_stem(self) -> None:
+        self.assertEqual(vcf_stem("/data/sample.vcf.gz"), "sample")
+        self.assertEqual(vcf_stem("sample.vcf"), "sample")
+        self.assertEqual(vcf_stem("sample.txt"), "sample.txt")
+
+    def test_output_path(self) -> None:
+        self.assertEqual(
+            output_path("/data/sample.vcf.gz", "{dir}/{stem}.{ext}"),
+            "/data/sample.bedpe",
+        )
+        self.assertEqual(
+            output_path("/data/sample.vcf.gz", "out/{name}.{ext}", "parquet"),
+            "out/sample.vcf.gz.parquet",
+        )
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        for name, lines in [
+            ("good.vcf.gz", VCF_LINES),
+            ("bad.vcf.gz", VCF_LINES + ["chr1\t100"]),
+        ]:
+            with gzip.open(os.path.join(self.directory.name, name), "wt") as stream:
+                stream.write("\n".join(lines) + "\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_failures_do_not_abort_batch(self) -> None:
+        vcfs = expand_inputs([self.directory.name])
+        self.assertEqual(
+            [os.path.basename(vcf) for vcf in vcfs], ["bad.vcf.gz", "good.vcf.gz"]
+        )
+
+        results = {
+            os.path.basename(result.vcf): result
+            for result in run_batch(vcfs, template="{dir}/{stem}.{ext}", jobs=2)
+        }
+
+        self.assertFalse(results["bad.vcf.gz"].ok)
+        self.assertFalse(os.path.exists(results["bad.vcf.gz"].output))
+
+        self.assertTrue(results["good.vcf.gz"].ok)
+        self.assertEqual(results["good.vcf.gz"].variants, 1)
+        with open(results["good.vcf.gz"].output) as stream:
+            self.assertEqual(
+                stream.read(), "chr1\t99\t100\tchr1\t199\t200\tMantaDEL\t.\t.\t.\n"
+            )
+
+    def test_broken_pool(self) -> None:
+        vcfs = expand_inputs([self.directory.name])
+        with mock.patch("svtoolbox.batch.process_vcf", crash_on_bad):
+            results = {
+                os.path.basename(result.vcf): result
+                for result in run_batch(vcfs, template="{dir}/{stem}.{ext}", jobs=2)
+            }
+
+        # Files still running when the pool broke are failed, not lost
+        self.assertEqual(set(results), {"bad.vcf.gz", "good.vcf.gz"})
+        self.assertFalse(results["bad.vcf.gz"].ok)
+        self.assertIn("BrokenProcessPool", str(results["bad.vcf.gz"].error))
@@ -0,0 +1,144 @@
+import unittest
+
+from svtoolbox.bed import BedIndex, BedRegion, filter_variants, parse_bed
+from svtoolbox.core import Interval, Variant
+
+
+class TestBedIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.index = BedIndex(
+            parse_bed(
+                [
+                    "track name=blacklist",
+                    "chr1\t100\t200\tfirst",
+                    "chr1\t150\t300\tsecond",
+                    "chr1\t1000\t1010",
+                    "chr2\t0\t5000\tcentromere",
+                ]
+            )
+        )
+
+    def test_overlaps(self) -> None:
+        # BED regions are 0-based and half-open, intervals are 1-based and closed
+        self.assertFalse(
+            self.index.overlaps(Interval(chrom="chr1", left=50, right=100))
+        )
+        self.assertTrue(self.index.overlaps(Interval(chrom="chr1", left=50, right=101)))
+        self.assertTrue(
+            self.index.overlaps(Interval(chrom="chr1", left=300, right=400))
+        )
+        self.assertFalse(
+            self.index.overlaps(Interval(chrom="chr1", left=301, right=400))
+        )
+        self.assertTrue(self.index.overlaps(Interval(chrom="chr2", left=10, right=10)))
+        self.assertFalse(self.index.overlaps(Interval(chrom="chr3", left=10, right=10)))
+
+    def test_hits(self) -> None:
+        self.assertEqual(
+            [str(region) for region in self.index.hits(Interval("chr1", 190, 1001))],
+            ["first", "second", "chr1:1001-1010"],
+        )
+        self.assertEqual(
+            self.index.hits(Interval("chr1", 250, 250)),
+            [BedRegion(chrom="chr1", start=150, end=300, name="second")],
+        )
+        self.assertEqual(self.index.hits(Interval("chr1", 400, 900)), [])
+
+
+class TestFilterVariants(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.variants = [
+            Variant(
+                chrom="chr1",
+                pos=str(pos),
+                id=f"DEL_{pos}",
+                ref="A",
+                alt="<DEL>",
+                qual=".",
+                filter="PASS",
+                info=f"END={pos + 1000};SVTYPE=DEL;CIPOS=-10,10",
+                format="GT",
+                genotypes={"SAMPLE": "0/1"},
+            )
+            for pos in (100, 5000, 10000)
+        ]
+        self.regions = BedIndex(
+            [
+                BedRegion(chrom="chr1", start=0, end=95),
+                BedRegion(chrom="chr1", start=5500, end=11000),
+            ]
+        )
+
+    def test_exclude(self) -> None:
+        self.assertEqual(
+            [
+                variant.id
+                for variant in filter_variants(self.variants, exclude=self.regions)
+            ],
+            [],
+        )
+        self.assertEqual(
+            [
+                variant.id
+                for variant in filter_variants(
+                    self.variants,
+                    exclude=BedIndex([BedRegion(chrom="chr1", start=1099, end=1100)]),
+                )
+            ],
+            ["DEL_5000", "DEL_10000"],
+        )
+
+    def test_missing_end(self) -> None:
+        orphan = Variant(
+            chrom="chr1",
+            pos="7000",
+            id="BND_ORPHAN",
+            ref="A",
+            alt="A[chr1:200[",
+            qual=".",
+            filter="PASS",
+            info="SVTYPE=BND;MATEID=BND_MISSING",
+            format="GT",
+            genotypes={"SAMPLE": "0/1"},
+        )
+        no_end = Variant(
+            chrom="chr1",
+            pos="7000",
+            id="INS",
+            ref="A",
+            alt="<INS>",
+            qual=".",
+            filter="PASS",
+            info="SVTYPE=INS",
+            format="GT",
+            genotypes={"SAMPLE": "0/1"},
+        )
+        # The mate position in the ALT allele is used for the orphan BND
+        self.assertEqual(
+            [
+                variant.id
+                for variant in filter_variants(
+                    [orphan, no_end],
+                    exclude=BedIndex([BedRegion(chrom="chr1", start=150, end=250)]),
+                )
+            ],
+            ["INS"],
+        )
+        self.assertEqual(
+            [
+                variant.id
+                for variant in filter_variants([orphan, no_end], include=self.regions)
+            ],
+            ["INS"],
+        )
+
+    def test_include(self) -> None:
+        self.assertEqual(
+            [
+                variant.id
+                for variant in filter_variants(self.variants, include=self.regions)
+            ],
+            ["DEL_10000"],
+        )
@@ -0,0 +1,26 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from svtoolbox.bgzf import BLOCK_SIZE, EOF_BLOCK, BgzfWriter
+
+
+class TestBgzfWriter(unittest.TestCase):
+
+    def test_round_trip(self) -> None:
+        lines = [f"line {number}\n" for number in range(50000)]
+        with tempfile.TemporaryDirectory() as directory:
+            for threads in (1, 4):
+                path = os.path.join(directory, f"threads_{threads}.gz")
+                with BgzfWriter(path, threads=threads) as writer:
+                    for line in lines:
+                        writer.write(line)
+
+                with open(path, "rb") as stream:
+                    data = stream.read()
+                self.assertTrue(data.endswith(EOF_BLOCK))
+                self.assertGreater(len("".join(lines)), BLOCK_SIZE)
+
+                with gzip.open(path, "rt") as stream:
+                    self.assertEqual(stream.readlines(), lines)
@@ -0,0 +1,97 @@
+import unittest
+
+from svtoolbox.callers import DELLY, MANTA, detect_caller
+from svtoolbox.core import Interval, Position, Variant
+from svtoolbox.exceptions import InfoFieldNotFound, MissingMate
+
+
+def make_variant(chrom: str, pos: int, id: str, alt: str, info: str) -> Variant:
+    return Variant(
+        chrom=chrom,
+        pos=str(pos),
+        id=id,
+        ref="N",
+        alt=alt,
+        qual=".",
+        filter="PASS",
+        info=info,
+        format="GT",
+        genotypes={"SAMPLE": "0/1"},
+    )
+
+
+class TestDetectCaller(unittest.TestCase):
+
+    def test_source(self) -> None:
+        self.assertIs(detect_caller(["##source=GenerateSVCandidates 1.6.0"]), MANTA)
+        self.assertIs(detect_caller(["##source=DELLY"]), DELLY)
+
+    def test_info_definitions(self) -> None:
+        self.assertIs(
+            detect_caller(
+                [
+                    '##INFO=<ID=CHR2,Number=1,Type=String,Description="Chromosome for POS2">',
+                    '##INFO=<ID=POS2,Number=1,Type=Integer,Description="Genomic position for CHR2">',
+                ]
+            ),
+            DELLY,
+        )
+        self.assertIs(
+            detect_caller(
+                [
+                    '##INFO=<ID=MATEID,Number=.,Type=String,Description="ID of mate breakends">'
+                ]
+            ),
+            MANTA,
+        )
+
+    def test_unknown(self) -> None:
+        self.assertIsNone(detect_caller(["##fileformat=VCFv4.1"]))
+
+
+class TestDecoders(unittest.TestCase):
+
+    def assert_same_as_generic(self, variant: Variant) -> None:
+        """Check that the decoder agrees with the generic rules in Variant."""
+        decoded = [variant.end, variant.ci_start, variant.ci_end]
+        variant.decoder = None
+        self.assertEqual(decoded, [variant.end, variant.ci_start, variant.ci_end])
+
+    def test_manta(self) -> None:
+        deletion = make_variant(
+            "chr1", 100, "DEL", "<DEL>", "SVTYPE=DEL;END=200;CIPOS=-5,5;CIEND=-10,10"
+        )
+        first = make_variant(
+            "chr2", 200, "B:0", "N[chr4:400[", "SVTYPE=BND;MATEID=B:1;CIPOS=0,3"
+        )
+        second = make_variant(
+            "chr4", 400, "B:1", "]chr2:200]N", "SVTYPE=BND;MATEID=B:0"
+        )
+        for variant in (deletion, first, second):
+            variant.decoder = MANTA
+
+        with self.assertRaises(MissingMate):
+            first.end
+
+        first.mate, second.mate = second, first
+        self.assertEqual(first.end, Position(chrom="chr4", pos=400))
+        self.assertEqual(second.ci_end, Interval(chrom="chr2", left=200, right=203))
+        for variant in (deletion, first, second):
+            self.assert_same_as_generic(variant)
+
+    def test_delly(self) -> None:
+        breakend = make_variant(
+            "chr5",
+            500,
+            "BND0",
+            "N]chr6:600]",
+            "SVTYPE=BND;CHR2=chr6;POS2=600;CIEND=-2,2",
+        )
+        breakend.decoder = DELLY
+        self.assertEqual(breakend.ci_end, Interval(chrom="chr6", left=598, right=602))
+        self.assert_same_as_generic(breakend)
+
+        missing_end = make_variant("chr5", 500, "DEL0", "<DEL>", "SVTYPE=DEL")
+        missing_end.decoder = DELLY
+        with self.assertRaises(InfoFieldNotFound):
+            missing_end.end
@@ -0,0 +1,72 @@
+import gzip
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from svtoolbox.client import client
+from svtoolbox.exceptions import SampleNotFound
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_heavy_dependencies_are_not_imported_at_startup(self) -> None:
+        """Importing the client must not pull in pysam, pyarrow or the
+        process pool, since they are slow to import and only needed by
+        some commands."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, svtoolbox.client, svtoolbox.validation; "
+                "print(','.join(sorted(sys.modules)))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        modules = result.stdout.strip().split(",")
+        self.assertNotIn("pysam", modules)
+        self.assertNotIn("pyarrow", modules)
+        self.assertNotIn("multiprocessing", modules)
+        self.assertNotIn("concurrent.futures.process", modules)
+
+    def test_option_defaults_match_modules(self) -> None:
+        """The client repeats some defaults to avoid importing the modules
+        defining them at startup."""
+        from svtoolbox import batch, client, density, flanks, sort
+
+        self.assertEqual(client.DEFAULT_BUFFER_SIZE, sort.DEFAULT_BUFFER_SIZE)
+        self.assertEqual(client.DEFAULT_TEMPLATE, batch.DEFAULT_TEMPLATE)
+        self.assertEqual(client.DEFAULT_BIN_SIZE, density.DEFAULT_BIN_SIZE)
+        self.assertEqual(client.DEFAULT_FLANK, flanks.DEFAULT_FLANK)
+
+
+class TestCreateBedpe(unittest.TestCase):
+
+    def test_unknown_samples(self) -> None:
+        """Sample names are checked even if no FORMAT fields are exported."""
+        lines = [
+            "##fileformat=VCFv4.1",
+            "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tTUMOR",
+            "chr1\t100\tDEL\tN\t<DEL>\t.\tPASS\tSVTYPE=DEL;END=300\tGT\t0/1",
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            vcf = os.path.join(directory, "calls.vcf.gz")
+            with gzip.open(vcf, "wt") as out:
+                out.write("\n".join(lines) + "\n")
+
+            runner = CliRunner()
+            result = runner.invoke(client, ["create-bedpe", "--vcf", vcf])
+            self.assertEqual(result.exit_code, 0, result.output)
+            result = runner.invoke(
+                client, ["create-bedpe", "--vcf", vcf, "--samples", "TUMOR"]
+            )
+            self.assertEqual(result.exit_code, 0, result.output)
+            result = runner.invoke(
+                client, ["create-bedpe", "--vcf", vcf, "--samples", "NORMAL"]
+            )
+            self.assertIsInstance(result.exception, SampleNotFound)
@@ -0,0 +1,104 @@
+import unittest
+
+from svtoolbox.contigs import ContigDictionary, header_id
+from svtoolbox.exceptions import PositionOutOfRange
+from svtoolbox.parser import VcfReader
+
+
+class TestContigDictionary(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.contigs = ContigDictionary.from_header(
+            [
+                "##fileformat=VCFv4.1",
+                "##contig=<ID=chr1,length=1000>",
+                '##contig=<ID=chr2,assembly="GRCh38, primary",length=2000>',
+                "##contig=<ID=chrUn>",
+            ]
+        )
+
+    def test_from_header(self) -> None:
+        self.assertEqual(
+            [(contig.name, contig.id, contig.length) for contig in self.contigs],
+            [("chr1", 0, 1000), ("chr2", 1, 2000), ("chrUn", 2, None)],
+        )
+
+    def test_header_id(self) -> None:
+        line = '##INFO=<ID=END,Number=1,Type=Integer,Description="End">'
+        self.assertEqual(header_id(line), "END")
+        self.assertEqual(header_id("##INFO=<Number=1,ID=SVTYPE>"), "SVTYPE")
+        self.assertIsNone(header_id(line, "FORMAT"))
+        self.assertIsNone(header_id("##source=delly"))
+
+    def test_unknown_contigs_are_added(self) -> None:
+        self.assertNotIn("chrX", self.contigs)
+        self.assertEqual(self.contigs.id("chrX"), 3)
+        self.assertEqual(self.contigs.name(3), "chrX")
+        self.assertIsNone(self.contigs.length("chrX"))
+
+    def test_intern(self) -> None:
+        name = "".join(["chr", "2"])
+        self.assertIs(self.contigs.intern(name), self.contigs.name(1))
+
+    def test_contains_position(self) -> None:
+        self.assertTrue(self.contigs.contains_position("chr1", 1000))
+        self.assertFalse(self.contigs.contains_position("chr1", 1001))
+        self.assertTrue(self.contigs.contains_position("chrUn", 10**9))
+
+
+class TestReaderContigs(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.vcf_lines = [
+            "##fileformat=VCFv4.1",
+            "##contig=<ID=chr1,length=1000>",
+            "\t".join(
+                [
+                    "#CHROM",
+                    "POS",
+                    "ID",
+                    "REF",
+                    "ALT",
+                    "QUAL",
+                    "FILTER",
+                    "INFO",
+                    "FORMAT",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr1",
+                    "100",
+                    "A",
+                    "N",
+                    "<DEL>",
+                    ".",
+                    "PASS",
+                    "SVTYPE=DEL;END=200",
+                    ".",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr1",
+                    "2000",
+                    "B",
+                    "N",
+                    "<DEL>",
+                    ".",
+                    "PASS",
+                    "SVTYPE=DEL;END=2100",
+                    ".",
+                ]
+            ),
+        ]
+
+    def test_chromosome_names_are_interned(self) -> None:
+        reader = VcfReader(self.vcf_lines)
+        first, second = list(reader)
+        self.assertIs(first.chrom, second.chrom)
+        self.assertIs(first.chrom, reader.contigs.name(0))
+
+    def test_validate(self) -> None:
+        with self.assertRaises(PositionOutOfRange):
+            list(VcfReader(self.vcf_lines, validate=True))
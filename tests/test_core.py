@@ -300,6 +300,28 @@ class TestBreakpoints(unittest.TestCase):
             Position(chrom="chr8", pos=3000),
         )
 
+    def test_alt_mate(self) -> None:
+        variant = Variant(
+            chrom="chr5",
+            pos="500",
+            id="MantaBND:0",
+            ref="A",
+            alt="]chr6:600]A",
+            qual="1000",
+            filter="PASS",
+            info="SVTYPE=BND;MATEID=MantaBND:1",
+            format="GT",
+            genotypes={"SAMPLE": "1/1"},
+        )
+
+        self.assertEqual(variant.alt_mate, Position(chrom="chr6", pos=600))
+
+        variant.alt = "C[chr7:700["
+        self.assertEqual(variant.alt_mate, Position(chrom="chr7", pos=700))
+
+        variant.alt = "<DEL>"
+        self.assertIsNone(variant.alt_mate)
+
 
 class TestConfidenceIntervals(unittest.TestCase):
 
@@ -0,0 +1,124 @@
+import io
+import unittest
+
+from svtoolbox.dedup import deduplicate_vcf, find_duplicates, score_function
+from svtoolbox.parser import VcfReader
+from tests import HEADER, record
+
+
+class TestFindDuplicates(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lines = [
+            HEADER,
+            record(
+                "chr1", 1000, "DEL1", "<DEL>", "SVTYPE=DEL;END=2000;SU=4", qual="30"
+            ),
+            record(
+                "chr1", 1003, "DEL2", "<DEL>", "SVTYPE=DEL;END=1998;SU=2", qual="50"
+            ),
+            record("chr1", 1000, "DUP1", "<DUP>", "SVTYPE=DUP;END=2000", qual="20"),
+            record("chr1", 1010, "DEL3", "<DEL>", "SVTYPE=DEL;END=2000", qual="."),
+            record("chr1", 1000, "DEL4", "<DEL>", "SVTYPE=DEL;END=3000", qual="10"),
+            # Same ID as the first record, which parse_vcf would overwrite
+            record("chr1", 1000, "DEL1", "<DEL>", "SVTYPE=DEL;END=2000", qual="30"),
+        ]
+
+    def groups(self, **kwargs) -> dict:
+        groups = find_duplicates(VcfReader(self.lines), **kwargs)
+        return {group.kept.id: group.duplicate_ids for group in groups}
+
+    def test_identical(self) -> None:
+        self.assertEqual(
+            self.groups(),
+            {"DEL1": ["DEL1"], "DEL2": [], "DUP1": [], "DEL3": [], "DEL4": []},
+        )
+
+    def test_tolerance(self) -> None:
+        self.assertEqual(
+            self.groups(tolerance=5),
+            {"DEL2": ["DEL1", "DEL1"], "DUP1": [], "DEL3": [], "DEL4": []},
+        )
+
+    def test_score_key(self) -> None:
+        self.assertEqual(
+            self.groups(tolerance=10, score=score_function("SU")),
+            {"DEL1": ["DEL2", "DEL3", "DEL1"], "DUP1": [], "DEL4": []},
+        )
+
+    def test_breakends(self) -> None:
+        lines = [
+            HEADER,
+            record(
+                "chr1", 500, "A:0", "N[chr2:800[", "SVTYPE=BND;MATEID=A:1", qual="40"
+            ),
+            record(
+                "chr1", 502, "B:0", "N[chr2:801[", "SVTYPE=BND;MATEID=B:1", qual="60"
+            ),
+            record(
+                "chr1", 504, "C:0", "N[chr3:800[", "SVTYPE=BND;MATEID=C:1", qual="60"
+            ),
+        ]
+        groups = find_duplicates(VcfReader(lines), tolerance=2)
+        self.assertEqual(
+            {group.kept.id: group.duplicate_ids for group in groups},
+            {"B:0": ["A:0"], "C:0": []},
+        )
+
+
+class TestDeduplicateVcf(unittest.TestCase):
+
+    def test_output(self) -> None:
+        lines = [
+            "##fileformat=VCFv4.1",
+            HEADER,
+            record("chr1", 1000, "DEL1", "<DEL>", "SVTYPE=DEL;END=2000", qual="30"),
+            record("chr1", 1002, "DEL2", "<DEL>", "SVTYPE=DEL;END=2001", qual="50"),
+            record("chr2", 1000, "DEL3", "<DEL>", "SVTYPE=DEL;END=2000", qual="30"),
+        ]
+        out = io.StringIO()
+        result = deduplicate_vcf(lines, out, tolerance=2)
+        self.assertEqual(len(result.groups), 2)
+        self.assertEqual(result.repeated_ids, {})
+        output = out.getvalue().splitlines()
+        self.assertTrue(output[1].startswith("##INFO=<ID=DUPLICATES,"))
+        self.assertEqual(output[2], HEADER)
+        self.assertEqual([line.split("\t")[2] for line in output[3:]], ["DEL2", "DEL3"])
+        self.assertEqual(
+            output[3].split("\t")[7], "SVTYPE=DEL;END=2001;DUPLICATES=DEL1"
+        )
+        self.assertEqual(output[4], lines[4])
+
+    def test_repeated_ids(self) -> None:
+        lines = [
+            "##fileformat=VCFv4.1",
+            HEADER,
+            record("chr1", 1000, "X", "<DEL>", "SVTYPE=DEL;END=2000", qual="30"),
+            record("chr1", 1002, "DEL2", "<DEL>", "SVTYPE=DEL;END=2001", qual="50"),
+            record("chr2", 1000, "X", "<DUP>", "SVTYPE=DUP;END=2000", qual="30"),
+        ]
+        out = io.StringIO()
+        result = deduplicate_vcf(lines, out, tolerance=2)
+
+        # Both records with ID X are written, and reported
+        output = out.getvalue().splitlines()
+        self.assertEqual([line.split("\t")[2] for line in output[3:]], ["DEL2", "X"])
+        self.assertEqual(
+            {
+                name: [str(v.start) for v in variants]
+                for name, variants in result.repeated_ids.items()
+            },
+            {"X": ["chr1:1000", "chr2:1000"]},
+        )
+
+        report = io.StringIO()
+        result.write_report(report)
+        self.assertEqual(
+            report.getvalue().splitlines(),
+            [
+                "ID\tPOSITION\tREASON\tKEPT\tKEPT_POSITION",
+                "X\tchr1:1000\tduplicate\tDEL2\tchr1:1002",
+                "X\tchr1:1000\trepeated_id\t.\t.",
+                "X\tchr2:1000\trepeated_id\t.\t.",
+            ],
+        )
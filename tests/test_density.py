@@ -0,0 +1,79 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+from svtoolbox.density import BreakpointDensity, accumulate_density, breakpoint_density
+from svtoolbox.parser import VcfReader
+from tests import HEADER, record
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestBreakpointDensity(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lines = [
+            "##contig=<ID=chr1,length=450>",
+            HEADER,
+            # Midpoints 100 and 300
+            record("chr1", 95, "DEL", "<DEL>", "SVTYPE=DEL;END=300;CIPOS=-5,15"),
+            # Only the start of a BND is counted, the mate counts the end
+            record("chr1", 101, "A:0", "N[chr2:50[", "SVTYPE=BND;MATEID=A:1"),
+            record("chr2", 50, "A:1", "]chr1:101]N", "SVTYPE=BND;MATEID=A:0"),
+            record("chr1", 420, "INS", "<INS>", "SVTYPE=INS;END=420"),
+            # A Delly translocation has one record with the mate in CHR2/POS2
+            record("chr1", 150, "TRA", "N]chr2:250]", "SVTYPE=BND;CHR2=chr2;POS2=250"),
+        ]
+
+    def density(self) -> BreakpointDensity:
+        reader = VcfReader(self.lines)
+        lengths = {contig.name: contig.length for contig in reader.contigs}
+        return breakpoint_density(reader, bin_size=100, lengths=lengths)
+
+    def test_counts(self) -> None:
+        density = self.density()
+        self.assertEqual(density.counts["chr1"].tolist(), [1, 2, 1, 0, 1])
+        self.assertEqual(density.counts["chr2"].tolist(), [1, 0, 1])
+        self.assertEqual(density.total, 7)
+
+    def test_merge(self) -> None:
+        density = self.density()
+        other = BreakpointDensity(bin_size=100)
+        other.add("chr2", numpy.array([0, 0, 3]))
+        density.merge(other)
+        self.assertEqual(density.counts["chr2"].tolist(), [1, 0, 4])
+        with self.assertRaises(ValueError):
+            density.merge(BreakpointDensity(bin_size=10))
+
+    def test_bedgraph(self) -> None:
+        out = io.StringIO()
+        self.assertEqual(self.density().write_bedgraph(out), 6)
+        self.assertEqual(
+            out.getvalue().splitlines()[:2], ["chr1\t0\t100\t1", "chr1\t100\t200\t2"]
+        )
+
+    def test_npz_and_files(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            vcfs = []
+            for name in ("a.vcf.gz", "b.vcf.gz"):
+                vcfs.append(os.path.join(directory, name))
+                with gzip.open(vcfs[-1], "wt") as out:
+                    out.write("\n".join(self.lines) + "\n")
+
+            density = accumulate_density(vcfs, bin_size=100, jobs=2)
+            self.assertEqual(density.counts["chr1"].tolist(), [2, 4, 2, 0, 2])
+
+            path = os.path.join(directory, "density.npz")
+            density.save_npz(path)
+            loaded = BreakpointDensity.load_npz(path)
+            self.assertEqual(loaded.bin_size, 100)
+            self.assertEqual(
+                {chrom: counts.tolist() for chrom, counts in loaded.counts.items()},
+                {"chr1": [2, 4, 2, 0, 2], "chr2": [2, 0, 2]},
+            )
@@ -0,0 +1,15 @@
+import unittest
+
+from svtoolbox.dependencies import import_optional
+from svtoolbox.exceptions import MissingDependency
+
+
+class TestImportOptional(unittest.TestCase):
+
+    def test_missing_dependency(self) -> None:
+        with self.assertRaises(MissingDependency) as context:
+            import_optional("svtoolbox_no_such_package")
+        self.assertEqual(str(context.exception), "svtoolbox_no_such_package")
+
+    def test_installed_dependency(self) -> None:
+        self.assertEqual(import_optional("json").__name__, "json")
@@ -0,0 +1,118 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from typing import List
+from unittest import mock
+
+import pysam
+
+from svtoolbox.flanks import (
+    BlockCache,
+    Window,
+    extract_flanks,
+    fetch_chromosome,
+    merge_windows,
+)
+from svtoolbox.parser import parse_vcf
+from tests import HEADER, record
+
+
+def crash_in_worker(
+    reference: str, chrom: str, windows: List[Window], *args
+) -> List[str]:
+    """Kill worker processes reading chr2, as running out of memory would."""
+    if chrom == "chr2" and multiprocessing.parent_process() is not None:
+        os._exit(1)
+    return fetch_chromosome(reference, chrom, windows, *args)
+
+
+class TestFlanks(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.reference = os.path.join(self.directory.name, "reference.fa")
+        self.sequences = {
+            "chr1": "ACGTACGTAA" * 10,
+            "chr2": "GGGGGCCCCC" * 3,
+        }
+        with open(self.reference, "w") as out:
+            for chrom, sequence in self.sequences.items():
+                out.write(f">{chrom}\n{sequence}\n")
+        pysam.faidx(self.reference)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_merge_windows(self) -> None:
+        windows = [
+            Window("c", "chr1", 50, 60),
+            Window("a", "chr1", 0, 10),
+            Window("b", "chr1", 5, 20),
+            Window("d", "chr1", 60, 70),
+        ]
+        self.assertEqual(merge_windows(windows), [(0, 20), (50, 70)])
+
+    def test_block_cache(self) -> None:
+        with pysam.FastaFile(self.reference) as fasta:
+            cache = BlockCache(fasta, block_size=8, max_blocks=2)
+            self.assertEqual(cache.fetch("chr1", 5, 21), self.sequences["chr1"][5:21])
+            self.assertEqual(cache.reads, 3)
+            # The last two blocks are still cached, the first one is not
+            self.assertEqual(cache.fetch("chr1", 8, 24), self.sequences["chr1"][8:24])
+            self.assertEqual(cache.reads, 3)
+            self.assertEqual(cache.fetch("chr1", 0, 4), self.sequences["chr1"][:4])
+            self.assertEqual(cache.reads, 4)
+            # Sequence is cut short at the end of the chromosome
+            self.assertEqual(cache.fetch("chr2", 25, 40), self.sequences["chr2"][25:])
+
+    def test_extract_flanks(self) -> None:
+        variants = parse_vcf(
+            [
+                HEADER,
+                record("chr1", 20, "DEL", "<DEL>", "SVTYPE=DEL;END=40;CIEND=-2,2"),
+                record("chr1", 3, "A:0", "N[chr2:10[", "SVTYPE=BND;MATEID=A:1"),
+                record("chr2", 10, "A:1", "]chr1:3]N", "SVTYPE=BND;MATEID=A:0"),
+            ]
+        ).values()
+        for jobs in (1, 2):
+            out = io.StringIO()
+            records = extract_flanks(variants, self.reference, out, flank=5, jobs=jobs)
+            self.assertEqual(records, 6)
+            lines = out.getvalue().splitlines()
+            names, sequences = lines[0::2], lines[1::2]
+            self.assertEqual(
+                names,
+                [
+                    ">DEL_start",
+                    ">DEL_end",
+                    ">A:0_start",
+                    ">A:0_end",
+                    ">A:1_start",
+                    ">A:1_end",
+                ],
+            )
+            chr1, chr2 = self.sequences["chr1"], self.sequences["chr2"]
+            self.assertEqual(
+                sequences,
+                [chr1[14:25], chr1[32:47], chr1[:8], chr2[4:15], chr2[4:15], chr1[:8]],
+            )
+
+    def test_broken_pool(self) -> None:
+        variants = parse_vcf(
+            [
+                HEADER,
+                record("chr1", 20, "DEL", "<DEL>", "SVTYPE=DEL;END=40"),
+                record("chr2", 10, "INS", "<INS>", "SVTYPE=INS"),
+            ]
+        ).values()
+        out = io.StringIO()
+        with mock.patch("svtoolbox.flanks.fetch_chromosome", crash_in_worker):
+            records = extract_flanks(variants, self.reference, out, flank=5, jobs=2)
+        self.assertEqual(records, 3)
+        chr1, chr2 = self.sequences["chr1"], self.sequences["chr2"]
+        self.assertEqual(
+            out.getvalue().splitlines()[1::2], [chr1[14:25], chr1[34:45], chr2[4:15]]
+        )
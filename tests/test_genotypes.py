@@ -0,0 +1,113 @@
+import unittest
+
+from svtoolbox.exceptions import SampleNotFound
+from svtoolbox.genotypes import genotype_matrix, iter_genotype_matrices
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class TestGenotypeMatrix(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        self.vcf_lines = [
+            "##fileformat=VCFv4.1",
+            "\t".join(
+                [
+                    "#CHROM",
+                    "POS",
+                    "ID",
+                    "REF",
+                    "ALT",
+                    "QUAL",
+                    "FILTER",
+                    "INFO",
+                    "FORMAT",
+                    "NORMAL",
+                    "TUMOR",
+                    "OTHER",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr1",
+                    "100",
+                    "MantaDEL",
+                    "A",
+                    "<DEL>",
+                    ".",
+                    "PASS",
+                    "END=200;SVTYPE=DEL",
+                    "GT:PR:SR",
+                    "0/0:15,0:30,0",
+                    "0|1:30,5:60,20",
+                    "./.:.:.",
+                ]
+            ),
+            "\t".join(
+                [
+                    "chr3",
+                    "300",
+                    "MantaDUP",
+                    "G",
+                    "<DUP>",
+                    ".",
+                    "PASS",
+                    "END=400;SVTYPE=DUP",
+                    "GT:PR",
+                    "0/0:45,0",
+                    "1/1:25,15",
+                    "1:10,10",
+                ]
+            ),
+        ]
+
+    def test_genotype_matrix(self) -> None:
+        matrix = genotype_matrix(self.vcf_lines)
+
+        self.assertEqual(matrix.ids, ["MantaDEL", "MantaDUP"])
+        self.assertEqual(matrix.samples, ["NORMAL", "TUMOR", "OTHER"])
+
+        self.assertEqual(matrix["GT"].dtype, numpy.int8)
+        self.assertEqual(
+            matrix["GT"].tolist(),
+            [[[0, 0], [0, 1], [-1, -1]], [[0, 0], [1, 1], [1, -1]]],
+        )
+
+        self.assertEqual(matrix["PR"].dtype, numpy.int32)
+        self.assertEqual(
+            matrix["PR"].tolist(),
+            [[[15, 0], [30, 5], [-1, -1]], [[45, 0], [25, 15], [10, 10]]],
+        )
+
+        # The second variant has no SR values
+        self.assertEqual(
+            matrix["SR"].tolist(),
+            [[[30, 0], [60, 20], [-1, -1]], [[-1, -1], [-1, -1], [-1, -1]]],
+        )
+
+    def test_sample_subset(self) -> None:
+        matrix = genotype_matrix(self.vcf_lines, keys=["PR"], samples=["TUMOR"])
+        self.assertEqual(list(matrix.arrays), ["PR"])
+        self.assertEqual(matrix["PR"].tolist(), [[[30, 5]], [[25, 15]]])
+
+    def test_chunks(self) -> None:
+        chunks = list(iter_genotype_matrices(self.vcf_lines, chunk_size=1))
+        self.assertEqual([chunk.ids for chunk in chunks], [["MantaDEL"], ["MantaDUP"]])
+        self.assertEqual(chunks[0]["GT"].tolist(), [[[0, 0], [0, 1], [-1, -1]]])
+
+    def test_arrays_are_sized_to_the_rows_read(self) -> None:
+        chunks = list(iter_genotype_matrices(self.vcf_lines))
+        self.assertEqual(len(chunks), 1)
+        for array in chunks[0].arrays.values():
+            self.assertEqual(array.shape, (2, 3, 2))
+            # Not a view of a larger chunk_size buffer
+            self.assertIsNone(array.base)
+
+    def test_sample_not_found(self) -> None:
+        with self.assertRaises(SampleNotFound):
+            genotype_matrix(self.vcf_lines, samples=["NON_EXISTENT_SAMPLE"])
@@ -0,0 +1,62 @@
+import unittest
+
+from svtoolbox.graph import UnionFind, rearrangement_components
+from svtoolbox.parser import parse_vcf
+from tests import HEADER, record
+
+
+class TestUnionFind(unittest.TestCase):
+
+    def test_union_and_find(self) -> None:
+        sets = UnionFind(5)
+        sets.union(0, 1)
+        sets.union(3, 4)
+        sets.union(1, 4)
+        self.assertEqual(len({sets.find(node) for node in range(5)}), 2)
+        self.assertEqual(sets.find(0), sets.find(3))
+        self.assertNotEqual(sets.find(0), sets.find(2))
+
+
+class TestRearrangementComponents(unittest.TestCase):
+
+    def setUp(self) -> None:
+
+        # A chain of translocations chr1 -> chr2 -> chr3, where the second
+        # BND pair starts next to the mate of the first one, plus a deletion
+        # far away from everything else.
+        self.variants = parse_vcf(
+            [
+                HEADER,
+                record("chr1", 1000, "A:0", "N[chr2:5000[", "SVTYPE=BND;MATEID=A:1"),
+                record("chr1", 90000, "DEL", "<DEL>", "SVTYPE=DEL;END=95000"),
+                record("chr2", 5000, "A:1", "]chr1:1000]N", "SVTYPE=BND;MATEID=A:0"),
+                record(
+                    "chr2",
+                    5100,
+                    "B:0",
+                    "N[chr3:700[",
+                    "SVTYPE=BND;MATEID=B:1;CIPOS=-50,50",
+                ),
+                record("chr3", 700, "B:1", "]chr2:5100]N", "SVTYPE=BND;MATEID=B:0"),
+                record(
+                    "chr4", 100, "DELLY", "N]chr5:200]", "SVTYPE=BND;CHR2=chr5;POS2=200"
+                ),
+            ]
+        ).values()
+
+    def test_components_without_proximity(self) -> None:
+        self.assertEqual(
+            rearrangement_components(self.variants, distance=0),
+            {"A:0": 0, "DEL": 1, "A:1": 0, "B:0": 2, "B:1": 2, "DELLY": 3},
+        )
+
+    def test_components_with_proximity(self) -> None:
+        self.assertEqual(
+            rearrangement_components(self.variants, distance=50),
+            {"A:0": 0, "DEL": 1, "A:1": 0, "B:0": 0, "B:1": 0, "DELLY": 2},
+        )
+
+    def test_deletion_breakends_join_nearby_variants(self) -> None:
+        components = rearrangement_components(self.variants, distance=100000)
+        self.assertEqual(components["DEL"], components["A:0"])
+        self.assertNotEqual(components["DELLY"], components["A:0"])
@@ -0,0 +1,113 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from svtoolbox.incremental import merge_outputs, run_incremental
+
+VCF_LINES = [
+    "##fileformat=VCFv4.1",
+    "\t".join(
+        ["#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", "FORMAT", "S"]
+    ),
+    "\t".join(
+        [
+            "chr1",
+            "100",
+            "MantaDEL",
+            "A",
+            "<DEL>",
+            ".",
+            "PASS",
+            "END=200;SVTYPE=DEL",
+            "GT",
+            "0/1",
+        ]
+    ),
+]
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.manifest = os.path.join(self.directory.name, "manifest.json")
+        self.template = os.path.join(self.directory.name, "{stem}.{ext}")
+        self.vcfs = [
+            self.write_vcf("first.vcf.gz", VCF_LINES),
+            self.write_vcf("second.vcf.gz", VCF_LINES),
+        ]
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def write_vcf(self, name: str, lines: list) -> str:
+        path = os.path.join(self.directory.name, name)
+        with gzip.open(path, "wt") as stream:
+            stream.write("\n".join(lines) + "\n")
+        return path
+
+    def skipped(self, vcfs: list) -> dict:
+        return {
+            os.path.basename(result.vcf): skipped
+            for result, skipped in run_incremental(
+                vcfs, manifest_path=self.manifest, template=self.template
+            )
+        }
+
+    def test_only_changed_inputs_are_processed(self) -> None:
+        self.assertEqual(
+            self.skipped(self.vcfs), {"first.vcf.gz": False, "second.vcf.gz": False}
+        )
+        self.assertEqual(
+            self.skipped(self.vcfs), {"first.vcf.gz": True, "second.vcf.gz": True}
+        )
+
+        # Touching a file without changing it does not count as a change
+        os.utime(self.vcfs[0], (0, 0))
+        self.write_vcf("second.vcf.gz", VCF_LINES + [VCF_LINES[-1]])
+        self.assertEqual(
+            self.skipped(self.vcfs), {"first.vcf.gz": True, "second.vcf.gz": False}
+        )
+
+        # Missing outputs are recreated
+        os.remove(os.path.join(self.directory.name, "first.bedpe"))
+        self.assertEqual(
+            self.skipped(self.vcfs), {"first.vcf.gz": False, "second.vcf.gz": True}
+        )
+
+    def test_interrupted_run(self) -> None:
+        self.skipped(self.vcfs)
+        extra = VCF_LINES[-1].replace("MantaDEL", "MantaDEL2")
+        for vcf in self.vcfs:
+            self.write_vcf(os.path.basename(vcf), VCF_LINES + [extra])
+
+        # Stop after the first input, before the second one is converted
+        results = run_incremental(
+            self.vcfs, manifest_path=self.manifest, template=self.template
+        )
+        result, skipped = next(results)
+        self.assertEqual(os.path.basename(result.vcf), "first.vcf.gz")
+        self.assertFalse(skipped)
+        results.close()
+
+        self.assertEqual(
+            self.skipped(self.vcfs), {"first.vcf.gz": True, "second.vcf.gz": False}
+        )
+        with open(os.path.join(self.directory.name, "second.bedpe")) as stream:
+            self.assertEqual(len(stream.readlines()), 2)
+
+    def test_merge_outputs(self) -> None:
+        self.skipped(self.vcfs)
+        combined = os.path.join(self.directory.name, "combined.bedpe")
+        merge_outputs(
+            [
+                os.path.join(self.directory.name, f"{name}.bedpe")
+                for name in ("first", "second")
+            ],
+            combined,
+        )
+        with open(combined) as stream:
+            self.assertEqual(
+                stream.read(), "chr1\t99\t100\tchr1\t199\t200\tMantaDEL\t.\t.\t.\n" * 2
+            )
@@ -0,0 +1,67 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from click.testing import CliRunner
+
+from svtoolbox.client import client
+from svtoolbox.memory import MIN_PENDING, MemoryBudget, format_size, peak_rss
+
+
+class TestMemoryBudget(unittest.TestCase):
+
+    def test_unbounded(self) -> None:
+        budget = MemoryBudget()
+        self.assertIsNone(budget.sort_buffer)
+        self.assertIsNone(budget.max_pending)
+        self.assertIsNone(budget.batch_size)
+
+    def test_shares(self) -> None:
+        budget = MemoryBudget(total=1 << 30)
+        self.assertEqual(budget.sort_buffer, 1 << 29)
+        self.assertEqual(budget.max_pending, (1 << 28) // 4096)
+        self.assertEqual(MemoryBudget(total=1000).max_pending, MIN_PENDING)
+
+    def test_peak_rss(self) -> None:
+        self.assertGreater(peak_rss(), 1 << 20)
+        self.assertEqual(format_size(512), "512B")
+        self.assertEqual(format_size(3 << 29), "1.5G")
+
+
+class TestMaxMemoryOption(unittest.TestCase):
+
+    def test_create_bedpe(self) -> None:
+        header = "\t".join(
+            [
+                "#CHROM",
+                "POS",
+                "ID",
+                "REF",
+                "ALT",
+                "QUAL",
+                "FILTER",
+                "INFO",
+                "FORMAT",
+                "SAMPLE",
+            ]
+        )
+        records = [
+            "chr1\t100\tB:0\tN\tN[chr2:200[\t.\tPASS\tSVTYPE=BND;MATEID=B:1\tGT\t0/1",
+            "chr1\t150\tDEL\tN\t<DEL>\t.\tPASS\tSVTYPE=DEL;END=300\tGT\t0/1",
+            "chr2\t200\tB:1\tN\t]chr1:100]N\t.\tPASS\tSVTYPE=BND;MATEID=B:0\tGT\t0/1",
+        ]
+        with tempfile.TemporaryDirectory() as directory:
+            vcf = os.path.join(directory, "calls.vcf.gz")
+            with gzip.open(vcf, "wt") as out:
+                out.write("\n".join([header] + records) + "\n")
+
+            result = CliRunner().invoke(
+                client,
+                ["--max-memory", "64M", "create-bedpe", "--vcf", vcf, "--sort"],
+            )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        lines = [line for line in result.output.splitlines() if "\t" in line]
+        self.assertEqual([line.split("\t")[6] for line in lines], ["B:0", "DEL", "B:1"])
+        self.assertIn("Peak memory:", result.output)
@@ -1,7 +1,8 @@
 import unittest
 
 from svtoolbox.core import Position
-from svtoolbox.parser import parse_vcf
+from svtoolbox.exceptions import SampleNotFound
+from svtoolbox.parser import MateResolver, VcfReader, parse_vcf, resolve_mates
 
 
 class TestVcfParser(unittest.TestCase):
@@ -104,6 +105,7 @@ class TestVcfParser(unittest.TestCase):
             ),
         ]
 
+        self.vcf_lines = vcf_lines
         self.variants = parse_vcf(vcf_lines)
 
     def test_variant_start(self) -> None:
@@ -155,3 +157,53 @@ class TestVcfParser(unittest.TestCase):
             self.variants["MantaDEL"].genotypes,
             {"NORMAL": "15,0:30,0", "TUMOR": "30,5:60,20"},
         )
+
+    def test_reader_header_and_samples(self) -> None:
+        reader = VcfReader(self.vcf_lines)
+        self.assertEqual(len(reader.header), 4)
+        self.assertEqual(reader.samples, ["NORMAL", "TUMOR"])
+        self.assertEqual(
+            [variant.id for variant in reader],
+            ["MantaDEL", "MantaBND:0", "MantaDUP", "MantaBND:1", "BND000012345"],
+        )
+
+    def test_sample_subset(self) -> None:
+        variants = parse_vcf(self.vcf_lines, samples=["TUMOR"])
+        self.assertDictEqual(variants["MantaDEL"].genotypes, {"TUMOR": "30,5:60,20"})
+        self.assertEqual(
+            variants["MantaDEL"].get_genotype(sample="TUMOR", key="SR"), "60,20"
+        )
+        self.assertEqual(variants["MantaBND:0"].end, Position(chrom="chr4", pos=400))
+
+    def test_no_samples(self) -> None:
+        reader = VcfReader(self.vcf_lines, samples=[])
+        self.assertEqual(reader.samples, [])
+        self.assertTrue(all(variant.genotypes == {} for variant in reader))
+
+    def test_sample_not_found(self) -> None:
+        with self.assertRaises(SampleNotFound):
+            parse_vcf(self.vcf_lines, samples=["NON_EXISTENT_SAMPLE"])
+
+    def test_resolve_mates(self) -> None:
+        variants = list(resolve_mates(VcfReader(self.vcf_lines)))
+        self.assertEqual(
+            [variant.id for variant in variants],
+            ["MantaDEL", "MantaDUP", "MantaBND:0", "MantaBND:1", "BND000012345"],
+        )
+        self.assertEqual(variants[2].end, Position(chrom="chr4", pos=400))
+        self.assertEqual(variants[3].end, Position(chrom="chr2", pos=200))
+
+    def test_resolve_mates_spilled(self) -> None:
+        resolver = MateResolver(max_pending=0)
+        variants = [
+            resolved
+            for variant in VcfReader(self.vcf_lines)
+            for resolved in resolver.add(variant)
+        ]
+        variants.extend(resolver.finish())
+        self.assertEqual(resolver.spilled, 1)
+        self.assertEqual(
+            [variant.id for variant in variants],
+            ["MantaDEL", "MantaDUP", "MantaBND:0", "MantaBND:1", "BND000012345"],
+        )
+        self.assertEqual(variants[3].end, Position(chrom="chr2", pos=200))
@@ -0,0 +1,79 @@
+import random
+import unittest
+
+from svtoolbox.contigs import ContigDictionary
+from svtoolbox.core import BedPE
+from svtoolbox.sort import ExternalSorter, bedpe_sort_key, sort_bedpe
+
+
+def make_bedpe(chrom_1: str, start_1: int, chrom_2: str, start_2: int) -> BedPE:
+    return BedPE(
+        chrom_1=chrom_1,
+        start_1=start_1,
+        end_1=start_1 + 10,
+        chrom_2=chrom_2,
+        start_2=start_2,
+        end_2=start_2 + 10,
+        name=f"{chrom_1}:{start_1}-{chrom_2}:{start_2}",
+        score=None,
+        strand_1=None,
+        strand_2=None,
+    )
+
+
+class TestExternalSort(unittest.TestCase):
+
+    def test_sort_key_order(self) -> None:
+        keys = [
+            bedpe_sort_key(make_bedpe("chr1", 100, "chr2", 5)),
+            bedpe_sort_key(make_bedpe("chr1", -5, "chr1", 5)),
+            bedpe_sort_key(make_bedpe("chr10", 0, "chr1", 0)),
+            bedpe_sort_key(make_bedpe("chr1", 100, "chr1", 500)),
+            bedpe_sort_key(make_bedpe("chr2", 0, "chr1", 0)),
+        ]
+        self.assertEqual([keys.index(key) for key in sorted(keys)], [1, 3, 0, 2, 4])
+
+    def test_sort_key_contig_order(self) -> None:
+        contigs = ContigDictionary()
+        contigs.add("chr2")
+        contigs.add("chr10")
+        bedpes = [
+            make_bedpe("chr10", 5, "chr2", 0),
+            make_bedpe("chr2", 100, "chr10", 0),
+            make_bedpe("chr2", 100, "chr2", 0),
+        ]
+        self.assertEqual(
+            list(sort_bedpe(bedpes, contigs=contigs)),
+            [str(bedpes[2]), str(bedpes[1]), str(bedpes[0])],
+        )
+
+    def test_sort_bedpe_with_spilling(self) -> None:
+        generator = random.Random(42)
+        bedpes = [
+            make_bedpe(
+                generator.choice(["chr1", "chr2", "chr10", "chrX"]),
+                generator.randrange(-100, 1_000_000),
+                generator.choice(["chr1", "chr2", "chr10", "chrX"]),
+                generator.randrange(0, 1_000_000),
+            )
+            for _ in range(5000)
+        ]
+        expected = [
+            str(bedpe)
+            for bedpe in sorted(
+                bedpes,
+                key=lambda bedpe: (
+                    bedpe.chrom_1,
+                    bedpe.start_1,
+                    bedpe.chrom_2,
+                    bedpe.start_2,
+                    str(bedpe),
+                ),
+            )
+        ]
+        # A tiny buffer forces many runs and several merge rounds
+        self.assertEqual(list(sort_bedpe(bedpes, buffer_size=5_000)), expected)
+        self.assertEqual(list(sort_bedpe(bedpes)), expected)
+
+    def test_empty(self) -> None:
+        self.assertEqual(list(ExternalSorter()), [])
@@ -0,0 +1,133 @@
+import unittest
+
+from svtoolbox.parser import VcfReader
+from svtoolbox.stats import LogHistogram, variant_stats
+from tests import HEADER, record
+
+
+class TestLogHistogram(unittest.TestCase):
+
+    def test_quantiles_are_approximately_right(self) -> None:
+        histogram = LogHistogram(bins_per_octave=16)
+        for value in range(1, 10001):
+            histogram.add(value)
+        for q in (0.1, 0.5, 0.9):
+            estimate = histogram.quantile(q)
+            assert estimate is not None
+            self.assertAlmostEqual(estimate / (q * 10000), 1, delta=0.05)
+
+    def test_zeros_and_empty(self) -> None:
+        histogram = LogHistogram()
+        self.assertIsNone(histogram.quantile(0.5))
+        histogram.add(0)
+        histogram.add(-3)
+        self.assertEqual(histogram.quantile(0.0), 0.0)
+        self.assertEqual(
+            histogram.to_dict()["histogram"],
+            [{"min": 0, "max": 1, "count": 1}, {"min": 2, "max": 4, "count": 1}],
+        )
+
+
+class TestVariantStats(unittest.TestCase):
+
+    def test_variant_stats(self) -> None:
+        stats = variant_stats(
+            VcfReader(
+                [
+                    HEADER,
+                    record(
+                        "chr1",
+                        100,
+                        "DEL",
+                        "<DEL>",
+                        "SVTYPE=DEL;END=1100;CIPOS=-5,5",
+                        filter="PASS",
+                    ),
+                    record(
+                        "chr1",
+                        100,
+                        "DUP",
+                        "<DUP>",
+                        "SVTYPE=DUP;SVLEN=300",
+                        filter="MinQUAL;MinGQ",
+                    ),
+                    record(
+                        "chr1",
+                        500,
+                        "A:0",
+                        "N[chr1:900[",
+                        "SVTYPE=BND;MATEID=A:1",
+                        filter="PASS",
+                    ),
+                    record(
+                        "chr1",
+                        900,
+                        "A:1",
+                        "]chr1:500]N",
+                        "SVTYPE=BND;MATEID=A:0",
+                        filter="PASS",
+                    ),
+                    record(
+                        "chr2",
+                        500,
+                        "B:0",
+                        "N[chr3:900[",
+                        "SVTYPE=BND;MATEID=B:1",
+                        filter="PASS",
+                    ),
+                ]
+            )
+        ).to_dict()
+
+        self.assertEqual(stats["records"], 5)
+        self.assertEqual(stats["svtype"], {"BND": 3, "DEL": 1, "DUP": 1})
+        self.assertEqual(stats["filter"], {"PASS": 4, "MinQUAL": 1, "MinGQ": 1})
+        self.assertEqual(
+            stats["bnd"],
+            {"intrachromosomal": 2, "interchromosomal": 1, "orphan_mates": 1},
+        )
+        self.assertEqual(
+            stats["svlen"]["histogram"],
+            [
+                {"min": 292, "max": 304, "count": 1},
+                {"min": 981, "max": 1024, "count": 1},
+            ],
+        )
+        self.assertEqual(stats["ci_width"]["CIPOS"]["count"], 1)
+        self.assertEqual(stats["ci_width"]["CIEND"]["count"], 0)
+
+    def test_missing_lengths(self) -> None:
+        stats = variant_stats(
+            VcfReader(
+                [
+                    HEADER,
+                    record("chr1", 100, "INS", "<INS>", "SVTYPE=INS;SVLEN=."),
+                    record("chr1", 100, "DEL", "<DEL>", "SVTYPE=DEL;END=.;SVLEN=."),
+                    record("chr1", 100, "DUP", "<DUP>", "SVTYPE=DUP;SVLEN=.;END=400"),
+                ]
+            )
+        ).to_dict()
+
+        self.assertEqual(stats["records"], 3)
+        # Only the duplication has a length, taken from END
+        self.assertEqual(stats["svlen"]["count"], 1)
+        self.assertEqual(stats["svlen"]["histogram"][0]["min"], 292)
+
+    def test_svlen_quantiles(self) -> None:
+        """Every deletion is 500 bp, so every quantile should be close to 500."""
+        stats = variant_stats(
+            VcfReader(
+                [HEADER]
+                + [
+                    record(
+                        "chr1", pos, f"DEL{pos}", "<DEL>", f"SVTYPE=DEL;END={pos + 500}"
+                    )
+                    for pos in range(1000, 11000, 1000)
+                ]
+            )
+        ).to_dict()
+
+        quantiles = stats["svlen"]["quantiles"]
+        self.assertEqual(list(quantiles), ["0.05", "0.25", "0.5", "0.75", "0.95"])
+        for estimate in quantiles.values():
+            self.assertAlmostEqual(estimate / 500, 1, delta=0.025)